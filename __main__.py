@@ -1,14 +1,7 @@
 import os
 import sys
 import json
-from cli import BrushCli
-from canvasbrush import Brush
-from dotenv import load_dotenv
-from rich.console import Console
-
-load_dotenv()
-
-console = Console(highlight=False, stderr=True)
+from cli.client import forward
 
 program_name = "brush"
 
@@ -18,8 +11,46 @@ def err(message: str):
 
 
 if __name__ == "__main__":
+    # shells ask for completions on every tab press, which is answered from
+    # a precomputed file without anything but the standard library
+    if sys.argv[1:2] == ["__complete"]:
+        from cli.completion import complete
+
+        sys.exit(complete(sys.argv[2:]))
+
+    # hand the command to a running `brush serve` before importing anything
+    # heavy, and only run it here if there is none
+    if sys.argv[1:2] != ["serve"]:
+        code = forward(sys.argv[1:])
+        if code is not None:
+            sys.exit(code)
+
+    from cli import BrushCli
+
+    # parsing needs nothing but argparse, so `--help` and mistyped arguments
+    # are answered before canvasapi and rich are imported
     args = BrushCli.parser_init(program_name)
 
+    # printing a completion script needs neither configuration nor Canvas
+    if getattr(args, "shell", None):
+        sys.exit(BrushCli.completion(args, None))
+
+    from canvasbrush import Brush
+    from dotenv import load_dotenv
+    from cli.brush_cli import LazyConsole
+    from cli.client import fingerprint
+
+    # clients forward before they load .env, so a service is known by the
+    # environment it was started in. both load the same .env, which never
+    # overrides what the environment already sets.
+    args.fingerprint = fingerprint()
+
+    load_dotenv()
+
+    # rich is only imported if there is a warning to print, so that the
+    # machine-readable formats never load it
+    console = LazyConsole(highlight=False, stderr=True)
+
     userpath = os.environ.get("BRUSH_CONFIG_PATH")
     CONFIG_PATH = (
         userpath if userpath else os.path.join(os.path.expanduser("~"), ".brushrc")
@@ -54,4 +85,7 @@ if __name__ == "__main__":
     if not API_KEY:
         sys.exit(err('you must set the "CANVAS_API_KEY" environment variable'))
 
-    args.func(args, Brush(API_URL, API_KEY, config))
+    brush = Brush(API_URL, API_KEY, config)
+    brush.offline = getattr(args, "offline", None) or False
+
+    BrushCli.run(args, brush)
@@ -0,0 +1,236 @@
+"""Times Brush operations against a local stand-in Canvas server.
+
+Each operation runs on a fresh Brush with an empty cache directory, unless its
+name says it is warm, and is reported with how many HTTP requests it made.
+
+    python benchmarks/canvas.py [--assignments N] [--latency S] [--files N] ...
+"""
+
+import io
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import statistics
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rich.console import Console
+
+import cli.brush_cli
+from canvasbrush import Brush
+from canvasbrush.util import AssignmentPlusFile
+from benchmarks.mock_canvas import MockCanvas
+
+
+class Bench:
+    def __init__(self, canvas: MockCanvas, args: argparse.Namespace):
+        self.canvas = canvas
+        self.args = args
+        self.directory = tempfile.mkdtemp(prefix="brush-bench-")
+        self.config = {
+            "student_name": "John Doe",
+            "course_map": [
+                {"id": str(course_id), "aliases": [f"c{course_id}"]}
+                for course_id in canvas.courses
+            ],
+            "fan_out": args.fan_out,
+        }
+
+    def brush(self):
+        """Returns a Brush that shares nothing with the previous ones."""
+        return Brush(
+            self.canvas.url,
+            "benchmark-token",
+            {**self.config, "cache_dir": tempfile.mkdtemp(dir=self.directory)},
+        )
+
+    def measure(self, name: str, setup, operation, extra=None):
+        """Runs `operation` on what `setup` returns and prints its timings."""
+        durations, requests = [], []
+        for _ in range(self.args.runs):
+            state = setup()
+            self.canvas.reset()
+            started = time.perf_counter()
+            result = operation(state)
+            durations.append(time.perf_counter() - started)
+            requests.append(self.canvas.total)
+
+        median = statistics.median(durations)
+        line = f"{name:34} {median * 1000:9.1f} ms {statistics.median(requests):8.0f}"
+        if extra:
+            line += f"  {extra(result, median)}"
+        print(line)
+
+    def files(self, count: int):
+        """Writes `count` distinct files of the configured size."""
+        directory = tempfile.mkdtemp(dir=self.directory)
+        paths = []
+        for i in range(count):
+            path = os.path.join(directory, f"act{i + 1}.bin")
+            with open(path, "wb") as f:
+                f.write(i.to_bytes(4, "big") + os.urandom(self.args.file_size - 4))
+            paths.append(path)
+
+        return paths
+
+    def run(self):
+        number = max(1, len(self.canvas.courses[1]) // 8)
+
+        print(f"{'operation':34} {'median':>12} {'requests':>8}")
+
+        self.measure(
+            "resolve_course",
+            self.brush,
+            lambda brush: brush.resolve_course("c1"),
+        )
+
+        def resolved():
+            brush = self.brush()
+            return brush, brush.resolve_course("c1")
+
+        self.measure(
+            "resolve_assignment",
+            resolved,
+            lambda state: state[0].resolve_assignment(state[1], [f"act{number}"]),
+        )
+
+        def warm():
+            brush, course = resolved()
+            brush.resolve_assignment(course, ["act1"])
+            return brush, course
+
+        self.measure(
+            "resolve_assignment (warm)",
+            warm,
+            lambda state: state[0].resolve_assignment(state[1], [f"act{number}"]),
+        )
+
+        self.measure(
+            "resolve_assignment_from_filename",
+            self.brush,
+            lambda brush: brush.resolve_assignment_from_filename(
+                f"john_doe_c1_act{number}.pdf"
+            ),
+        )
+
+        def render(brush):
+            console = cli.brush_cli.console
+            cli.brush_cli.console = Console(file=io.StringIO(), width=100)
+            try:
+                # parsed like the CLI's own arguments, so every option the
+                # command reads is there with its default
+                args = cli.brush_cli.BrushCli.parser_init(
+                    "brush", ["assignments", "c1", "--format", "text"]
+                )
+                cli.brush_cli.BrushCli.list_assignments(args, brush)
+                return cli.brush_cli.console.file.getvalue()
+            finally:
+                cli.brush_cli.console = console
+
+        self.measure(
+            "list_assignments",
+            self.brush,
+            render,
+            lambda output, _: f"{output.count(chr(10)) + 1} lines",
+        )
+
+        paths = self.files(self.args.files)
+
+        def submissions():
+            brush = self.brush()
+            course = brush.resolve_course("c1")
+            return brush, [
+                AssignmentPlusFile(
+                    brush.resolve_assignment(course, [f"act{i + 1}"]), path
+                )
+                for i, path in enumerate(paths)
+            ]
+
+        def submit(state):
+            brush, assignments = state
+            return list(brush.bulk_submit(assignments, None))
+
+        size = self.args.files * self.args.file_size
+        self.measure(
+            f"bulk_submit ({self.args.files} files)",
+            submissions,
+            submit,
+            lambda _, seconds: f"{self.args.files / seconds:.1f} files/s, "
+            f"{size / seconds / 1024 / 1024:.1f} MiB/s",
+        )
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=3, help="default: 3")
+    parser.add_argument(
+        "--assignments", type=int, default=200, help="per course. default: 200"
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=10,
+        help="items per page when no per_page is asked for. default: 10",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.02,
+        help="seconds added to every API request. default: 0.02",
+    )
+    parser.add_argument(
+        "--upload-latency",
+        type=float,
+        default=0.05,
+        help="seconds added to every file upload. default: 0.05",
+    )
+    parser.add_argument(
+        "--files", type=int, default=8, help="files to bulk submit. default: 8"
+    )
+    parser.add_argument(
+        "--file-size",
+        type=int,
+        default=1024 * 1024,
+        help="bytes per submitted file. default: 1 MiB",
+    )
+    parser.add_argument(
+        "--request-cost",
+        type=float,
+        help="rate limit every API request at this cost, like Canvas does. default: no limit",
+    )
+    parser.add_argument(
+        "--fan-out", type=int, default=4, help="Brush's fan_out. default: 4"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=3, help="runs per operation. default: 3"
+    )
+    args = parser.parse_args()
+
+    # the stand-in server is plain HTTP on purpose
+    warnings.filterwarnings("ignore", "Canvas may respond unexpectedly")
+
+    with MockCanvas(
+        args.courses,
+        args.assignments,
+        args.page_size,
+        args.latency,
+        args.upload_latency,
+        args.request_cost,
+    ) as canvas:
+        bench = Bench(canvas, args)
+        try:
+            bench.run()
+        finally:
+            bench.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Checks how much the CLI imports before it can answer without Canvas.
+
+Runs `python -X importtime` over commands that argparse answers on its own and
+fails if they import any of the heavy dependencies, or if the imports on top
+of a bare interpreter take longer than the budget.
+
+    python benchmarks/importtime.py [--budget MS] [--runs N]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# commands that must be answered by argparse alone
+COMMANDS = [
+    ["--help"],
+    ["submit", "--help"],
+    ["assignments"],
+    ["completion", "bash"],
+    ["__complete", "1", "assignment", ""],
+]
+
+# only the commands that talk to Canvas may import these. completion may use
+# the parts of canvasbrush that only need the standard library.
+HEAVY = [
+    "canvasapi",
+    "canvasbrush.brush",
+    "requests",
+    "rich",
+    "validators",
+    "dateutil",
+]
+
+BUDGET_MS = 40.0
+
+
+def importtime(args: list[str]):
+    """Returns every module imported by a run, with its cumulative µs and
+    whether it was imported at the top level."""
+    env = {
+        **os.environ,
+        "BRUSH_SOCKET": os.path.join(ROOT, ".no-such-socket"),
+        "BRUSH_CONFIG_PATH": os.path.join(ROOT, ".no-such-config"),
+        # completing starts a refresh of the completion file when it is stale
+        "XDG_CACHE_HOME": os.path.join(tempfile.gettempdir(), "brush-importtime"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        modules[name.strip()] = (int(cumulative), not name.startswith("  "))
+
+    return modules
+
+
+def total_us(modules: dict):
+    return sum(us for us, top in modules.values() if top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=BUDGET_MS,
+        help=f"milliseconds of imports allowed per command. default: {BUDGET_MS}",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="runs per command, best kept. default: 5"
+    )
+    args = parser.parse_args()
+
+    baseline = set(importtime(["-c", "pass"]))
+
+    failed = False
+    for command in COMMANDS:
+        best = None
+        for _ in range(args.runs):
+            modules = {
+                name: timing
+                for name, timing in importtime(["__main__.py", *command]).items()
+                if name not in baseline
+            }
+            if best is None or total_us(modules) < total_us(best):
+                best = modules
+
+        total = total_us(best) / 1000
+        heavy = sorted(
+            {
+                package
+                for package in HEAVY
+                for name in best
+                if name == package or name.startswith(f"{package}.")
+            }
+        )
+        ok = total <= args.budget and not heavy
+        failed = failed or not ok
+
+        print(f"{'ok' if ok else 'FAIL':4} {total:7.1f} ms  brush {' '.join(command)}")
+        if heavy:
+            print(f"       imports {', '.join(heavy)}")
+        if not ok:
+            top = {name: us for name, (us, top) in best.items() if top}
+            for name, us in sorted(top.items(), key=lambda m: -m[1])[:5]:
+                print(f"       {us / 1000:7.1f} ms  {name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""A stand-in Canvas server for benchmarking Brush without a live instance.
+
+It serves synthetic courses over the parts of the API Brush uses: courses,
+paginated assignments with their submissions, quizzes, the file upload flow
+and submissions. Every request is counted, so a benchmark can report how many
+round trips an operation took.
+"""
+
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+# how the rate limit bucket behaves when it is turned on, as in Canvas
+BUCKET_SIZE = 700.0
+BUCKET_PENALTY = 50.0
+BUCKET_REFILL_RATE = 10.0
+
+NAMES = ["Activity {n}", "Exercise {n}", "Challenge {n}", "Evidence {n}"]
+
+
+def make_assignments(course_id: int, count: int):
+    """Returns `count` assignments that cycle through the naming families."""
+    assignments = []
+    for i in range(count):
+        number = i // len(NAMES) + 1
+        assignments.append(
+            {
+                "id": course_id * 100000 + i,
+                "course_id": course_id,
+                "position": i,
+                "name": NAMES[i % len(NAMES)].format(n=number),
+                "due_at": f"2030-{i % 12 + 1:02d}-{i % 28 + 1:02d}T06:59:59Z",
+                "lock_at": None,
+                "locked_for_user": False,
+                "lock_explanation": "",
+                "grading_type": "points",
+                "submission_types": ["online_upload"],
+                "quiz_id": None,
+                "points_possible": 100.0,
+                "updated_at": "2030-01-01T00:00:00Z",
+                "submission": {
+                    "assignment_id": course_id * 100000 + i,
+                    "workflow_state": "graded" if i % 3 == 0 else "unsubmitted",
+                    "submitted_at": "2030-01-01T00:00:00Z" if i % 3 == 0 else None,
+                    "graded_at": "2030-01-02T00:00:00Z" if i % 3 == 0 else None,
+                    "grade": "95" if i % 3 == 0 else None,
+                    "score": 95.0 if i % 3 == 0 else None,
+                },
+            }
+        )
+
+    return assignments
+
+
+class MockCanvas:
+    """A local HTTP server answering like a Canvas instance.
+
+    Start it with `start()`, point Brush at `url`, and read `requests` to see
+    how many requests each route received since the last `reset()`.
+    """
+
+    def __init__(
+        self,
+        courses: int = 3,
+        assignments: int = 100,
+        page_size: int = 10,
+        latency: float = 0.0,
+        upload_latency: float = 0.0,
+        request_cost: float = None,
+    ):
+        """
+        :param courses: How many courses to serve, with IDs from 1.
+        :type courses: int
+        :param assignments: How many assignments each course has.
+        :type assignments: int
+        :param page_size: How many items a page holds when the request does \
+            not ask for a `per_page`, which Canvas caps at 100.
+        :type page_size: int
+        :param latency: Seconds to wait before answering any API request.
+        :type latency: float
+        :param upload_latency: Seconds to wait before accepting a file.
+        :type upload_latency: float
+        :param request_cost: What each API request costs against a rate \
+            limit bucket that works like Canvas', or None for no rate limit.
+        :type request_cost: float
+        """
+        self.courses = {
+            course_id: make_assignments(course_id, assignments)
+            for course_id in range(1, courses + 1)
+        }
+        self.page_size = page_size
+        self.latency = latency
+        self.upload_latency = upload_latency
+        self.request_cost = request_cost
+        self.bucket_used = 0.0
+        self._leaked_at = time.monotonic()
+        self.requests: Counter = Counter()
+        self.uploaded_bytes = 0
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    @property
+    def total(self):
+        """How many requests were received since the last reset."""
+        return sum(self.requests.values())
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.uploaded_bytes = 0
+
+    def start(self):
+        mock = self
+
+        class Handler(RequestHandler):
+            canvas = mock
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def count(self, route: str):
+        with self._lock:
+            self.requests[route] += 1
+
+    def _leak(self):
+        now = time.monotonic()
+        self.bucket_used = max(
+            0.0, self.bucket_used - (now - self._leaked_at) * BUCKET_REFILL_RATE
+        )
+        self._leaked_at = now
+
+    def start_request(self):
+        """Charges a request's penalty, or returns False if it is throttled."""
+        with self._lock:
+            self._leak()
+            if self.bucket_used >= BUCKET_SIZE:
+                return False
+            self.bucket_used += BUCKET_PENALTY
+            return True
+
+    def finish_request(self):
+        """Swaps a request's penalty for its cost, returning what is left."""
+        with self._lock:
+            self._leak()
+            self.bucket_used += self.request_cost - BUCKET_PENALTY
+            return BUCKET_SIZE - self.bucket_used
+
+    def new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    canvas: MockCanvas = None
+
+    GET_ROUTES = [
+        (r"^/api/v1/courses/(\d+)$", "course"),
+        (r"^/api/v1/courses/(\d+)/assignments$", "assignments"),
+        (r"^/api/v1/courses/(\d+)/assignments/(\d+)$", "assignment"),
+        (r"^/api/v1/courses/(\d+)/assignments/(\d+)/submissions$", "submissions"),
+        (r"^/api/v1/courses/(\d+)/students/submissions$", "student_submissions"),
+        (r"^/api/v1/courses/(\d+)/quizzes$", "quizzes"),
+        (r"^/api/v1/files/(\d+)/create_success$", "create_success"),
+    ]
+    POST_ROUTES = [
+        (r"^/api/v1/courses/(\d+)/assignments/(\d+)/submissions/self/files$", "token"),
+        (r"^/upload/(\d+)$", "upload"),
+        (r"^/api/v1/courses/(\d+)/assignments/(\d+)/submissions$", "submit"),
+    ]
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch(self.GET_ROUTES)
+
+    def do_POST(self):
+        self._dispatch(self.POST_ROUTES)
+
+    def do_PUT(self):
+        self._dispatch([])
+
+    def do_DELETE(self):
+        self._dispatch([])
+
+    def _dispatch(self, routes: list):
+        url = urlparse(self.path)
+        self.query = parse_qs(url.query)
+        self.body = self._read_body()
+        self.charged = False
+
+        for pattern, name in routes:
+            match = re.match(pattern, url.path)
+            if match:
+                if name == "upload":
+                    self.canvas.count(f"{self.command} {name}")
+                    time.sleep(self.canvas.upload_latency)
+                    return self._upload(*(int(g) for g in match.groups()))
+
+                if self.canvas.request_cost is not None:
+                    if not self.canvas.start_request():
+                        self.canvas.count(f"{self.command} {name} (throttled)")
+                        return self._throttle()
+                    self.charged = True
+
+                self.canvas.count(f"{self.command} {name}")
+
+                time.sleep(self.canvas.latency)
+                return getattr(self, f"_{name}")(*(int(g) for g in match.groups()))
+
+        self.canvas.count(f"{self.command} unknown")
+        self._send(
+            404, {"errors": [{"message": "The specified resource does not exist."}]}
+        )
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            size = 0
+            while True:
+                length = int(self.rfile.readline().strip(), 16)
+                if length == 0:
+                    self.rfile.readline()
+                    return size
+                self.rfile.read(length)
+                self.rfile.readline()
+                size += length
+
+        length = int(self.headers.get("Content-Length") or 0)
+        remaining = length
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+
+        return length
+
+    def _course_assignments(self, course_id: int):
+        assignments = self.canvas.courses.get(course_id)
+        if assignments is None:
+            self._send(404, {"errors": [{"message": "course not found"}]})
+        return assignments
+
+    def _course(self, course_id):
+        if self._course_assignments(course_id) is not None:
+            self._send(200, {"id": course_id, "name": f"Course {course_id}"})
+
+    def _assignments(self, course_id):
+        assignments = self._course_assignments(course_id)
+        if assignments is None:
+            return
+
+        order_by = self.query.get("order_by", ["position"])[0]
+        if order_by == "due_at":
+            assignments = sorted(assignments, key=lambda a: a["due_at"] or "~")
+        elif order_by == "name":
+            assignments = sorted(assignments, key=lambda a: a["name"])
+
+        if "submission" not in self.query.get("include[]", []):
+            assignments = [
+                {k: v for k, v in a.items() if k != "submission"} for a in assignments
+            ]
+
+        self._send_page(assignments)
+
+    def _assignment(self, course_id, assignment_id):
+        assignments = self._course_assignments(course_id)
+        if assignments is None:
+            return
+
+        assignment = next((a for a in assignments if a["id"] == assignment_id), None)
+        if assignment:
+            self._send(200, assignment)
+        else:
+            self._send(404, {"errors": [{"message": "assignment not found"}]})
+
+    def _submissions(self, course_id, assignment_id):
+        assignments = self._course_assignments(course_id) or []
+        submissions = [
+            a["submission"]
+            for a in assignments
+            if a["id"] == assignment_id
+            and a["submission"]["workflow_state"] != "unsubmitted"
+        ]
+        self._send_page(submissions)
+
+    def _student_submissions(self, course_id):
+        assignments = self._course_assignments(course_id)
+        if assignments is not None:
+            self._send_page([a["submission"] for a in assignments])
+
+    def _quizzes(self, course_id):
+        self._send_page([])
+
+    def _token(self, course_id, assignment_id):
+        upload_id = self.canvas.new_id()
+        self._send(
+            200,
+            {
+                "upload_url": f"{self.canvas.url}/upload/{upload_id}",
+                "upload_params": {"key": f"uploads/{upload_id}"},
+            },
+        )
+
+    def _upload(self, upload_id):
+        with self.canvas._lock:
+            self.canvas.uploaded_bytes += self.body
+
+        self.send_response(303)
+        self.send_header(
+            "Location", f"{self.canvas.url}/api/v1/files/{upload_id}/create_success"
+        )
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _create_success(self, file_id):
+        self._send(
+            200,
+            {"id": file_id, "url": f"{self.canvas.url}/files/{file_id}/download"},
+        )
+
+    def _submit(self, course_id, assignment_id):
+        self._send(
+            201,
+            {
+                "id": self.canvas.new_id(),
+                "assignment_id": assignment_id,
+                "course_id": course_id,
+                "workflow_state": "submitted",
+                "submitted_at": "2030-01-01T00:00:00Z",
+            },
+        )
+
+    def _send_page(self, items: list):
+        per_page = min(int(self.query.get("per_page", [self.canvas.page_size])[0]), 100)
+        page = int(self.query.get("page", ["1"])[0])
+        last = max(1, -(-len(items) // per_page))
+
+        url = urlparse(self.path)
+        query = {k: v for k, v in self.query.items() if k != "page"}
+
+        def link(number: int, rel: str):
+            params = urlencode({**query, "page": number}, doseq=True)
+            return f'<{self.canvas.url}{url.path}?{params}>; rel="{rel}"'
+
+        links = [link(1, "first"), link(last, "last")]
+        if page < last:
+            links.append(link(page + 1, "next"))
+        if page > 1:
+            links.append(link(page - 1, "prev"))
+
+        self._send(
+            200,
+            items[(page - 1) * per_page : page * per_page],
+            {"Link": ",".join(links)},
+        )
+
+    def _throttle(self):
+        body = b"403 Forbidden (Rate Limit Exceeded)"
+        self.send_response(403)
+        self.send_header("X-Rate-Limit-Remaining", "0.0")
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send(self, status: int, payload, headers: dict = None):
+        body = json.dumps(payload).encode()
+        etag = f'W/"{hashlib.md5(body).hexdigest()}"'
+
+        headers = dict(headers or {})
+        if self.charged:
+            headers["X-Request-Cost"] = f"{self.canvas.request_cost:.4f}"
+            headers["X-Rate-Limit-Remaining"] = f"{self.canvas.finish_request():.4f}"
+
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
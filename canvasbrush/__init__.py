@@ -1,5 +1,14 @@
-from canvasbrush.brush import Brush
-
 __all__ = ["Brush"]
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str):
+    # Brush pulls in canvasapi, which shell completion must not wait for when
+    # it only needs `canvasbrush.fuzzy`
+    if name == "Brush":
+        from canvasbrush.brush import Brush
+
+        return Brush
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,133 @@
+import re
+from canvasapi.assignment import Assignment
+from canvasbrush.fuzzy import TrigramIndex
+
+FAMILIES = {
+    "activity": "act",
+    "actividad": "act",
+    "exercise": "exc",
+    "exc": "exc",
+    "challenge": "rto",
+    "ch": "rto",
+    "evidence": "evi",
+    "evi": "evi",
+    "evc": "evi",
+}
+
+PREVIOUS = "previous"
+PREVIOUS_TO_TOPIC = "previous to topic"
+
+
+def classify_name(name: str):
+    """Classifies an assignment name into its family, variant and number.
+
+    Returns a `(family, variant, number)` tuple. `family` is one of the token
+    prefixes ("act", "exc", "rto", "evi") or None, `variant` is None,
+    `PREVIOUS` or `PREVIOUS_TO_TOPIC`, and `number` is None when the name does
+    not carry one where its variant expects it.
+    """
+    words = name.lower().split()
+    if not words:
+        return (None, None, None)
+
+    family = FAMILIES.get(words[0])
+    if not family:
+        return (None, None, None)
+
+    # the last word is never considered when looking for the variant
+    splitwork = " ".join(words[:-1])
+    if "previous to topic" in splitwork or "previus to topic" in splitwork:
+        variant = PREVIOUS_TO_TOPIC
+        sub_split = words[4:]
+    elif "previous" in splitwork or "previus" in splitwork:
+        variant = PREVIOUS
+        sub_split = words[2:]
+    else:
+        variant = None
+        sub_split = words[1:]
+
+    number = None
+    if len(sub_split) > 0:
+        digits = re.sub("[^0-9]", "", sub_split[0])
+        if digits:
+            number = int(digits)
+
+    return (family, variant, number)
+
+
+class AssignmentIndex:
+    """A per-course index of assignments built from a single fetch."""
+
+    def __init__(self, assignments):
+        self.assignments: list[Assignment] = []
+        self._names = TrigramIndex()
+        self._by_key: dict[tuple, int] = {}
+        self._by_id: dict[int, int] = {}
+        self._families: set[str] = set()
+
+        for position, assignment in enumerate(assignments):
+            self.assignments.append(assignment)
+            self._names.add(assignment.name, assignment)
+            self._by_id[assignment.id] = position
+
+            family, variant, number = classify_name(assignment.name)
+            if not family:
+                continue
+
+            self._families.add(family)
+            if number is not None:
+                self._by_key.setdefault((family, variant, number), position)
+
+    def __len__(self):
+        return len(self.assignments)
+
+    def __iter__(self):
+        return iter(self.assignments)
+
+    def has_family(self, family: str):
+        """Whether any assignment in the index belongs to `family`."""
+        return family in self._families
+
+    def get(self, assignment_id: int):
+        """Returns the assignment with the given ID, if the index has it."""
+        position = self._by_id.get(assignment_id)
+        return self.assignments[position] if position is not None else None
+
+    def lookup(self, family: str, number: int, previous: bool = False):
+        """Finds the assignment of a family with the given number.
+
+        When `previous` is set, only the "previous" and "previous to topic"
+        variants are considered, and the earliest of them wins.
+        """
+        if previous:
+            positions = [
+                self._by_key[key]
+                for key in (
+                    (family, PREVIOUS, number),
+                    (family, PREVIOUS_TO_TOPIC, number),
+                )
+                if key in self._by_key
+            ]
+            position = min(positions) if positions else None
+        else:
+            position = self._by_key.get((family, None, number))
+
+        return self.assignments[position] if position is not None else None
+
+    def tokens(self):
+        """Returns the short forms, like `act3`, that name assignments here."""
+        return [
+            f"{family}{number}"
+            for family, number in sorted({(f, n) for f, _, n in self._by_key})
+        ]
+
+    def search(self, look_for: str):
+        """Returns the first assignment whose name contains `look_for`."""
+        return self._names.contains(look_for)
+
+    def suggest(self, look_for: str, limit: int = 3):
+        """Returns the names of the assignments most similar to `look_for`."""
+        return [
+            assignment.name
+            for _, _, assignment in self._names.search(look_for, limit=limit)
+        ]
@@ -0,0 +1,80 @@
+from datetime import datetime
+from canvasapi.assignment import Assignment
+
+
+class AssignmentRecord:
+    """A compact stand-in for :class:`canvasapi.assignment.Assignment`.
+
+    Listing and resolving assignments only reads a handful of their fields,
+    so a record keeps just those in slots, instead of setting every field of
+    the response on the instance and parsing every date in it like canvasapi
+    does. Anything else, such as `submit` or `get_submissions`, is handed to
+    a full `Assignment` built from the record the first time it is needed.
+    """
+
+    FIELDS = (
+        "id",
+        "course_id",
+        "name",
+        "position",
+        "due_at",
+        "lock_at",
+        "locked_for_user",
+        "lock_explanation",
+        "grading_type",
+        "submission_types",
+        "quiz_id",
+        "points_possible",
+        "updated_at",
+        "submission",
+    )
+
+    __slots__ = FIELDS + ("_requester", "_full")
+
+    submission_types: list[str]
+
+    def __init__(self, requester, attributes: dict):
+        """
+        :param requester: The requester to pass requests through.
+        :type requester: :class:`canvasapi.requester.Requester`
+        :param attributes: The assignment as Canvas returned it.
+        :type attributes: dict
+        """
+        self._requester = requester
+        self._full = None
+        for name in self.FIELDS:
+            setattr(self, name, attributes.get(name))
+
+        self.submission_types = attributes.get("submission_types") or []
+
+    def __getattr__(self, name: str):
+        # only called for what the record does not keep itself
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        return getattr(self.full(), name)
+
+    def __str__(self):
+        return f"{self.name} ({self.id})"
+
+    def __repr__(self):
+        return f"AssignmentRecord({self})"
+
+    @property
+    def due_at_date(self):
+        if self.due_at is None:
+            return None
+
+        # Canvas sends UTC with a Z, but offsets and fractional seconds parse
+        # too, as everywhere else due dates are read
+        return datetime.fromisoformat(self.due_at.replace("Z", "+00:00"))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def full(self):
+        """Returns a full `Assignment` with the fields the record keeps."""
+        if self._full is None:
+            self._full = Assignment(self._requester, self.to_dict())
+
+        return self._full
@@ -1,12 +1,38 @@
+import os
 import re
+import heapq
+import itertools
+import hashlib
+from typing import Any, Optional
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from canvasapi import Canvas
+from canvasapi.assignment import Assignment
 from canvasapi.course import Course
+from canvasapi.exceptions import CanvasException
+from canvasapi.paginated_list import PaginatedList
+from canvasapi.util import combine_kwargs
 from canvasbrush.util import (
     AssignmentPlusFile,
+    default_cache_dir,
     lower_remove_prefixes,
     number_from_end,
+    retry,
+    sha256_file,
+    was_not_processed,
 )
 from canvasbrush.uploader import Uploader
+from canvasbrush.assignment_index import AssignmentIndex
+from canvasbrush.assignment_record import AssignmentRecord
+from canvasbrush.fuzzy import TrigramIndex
+from canvasbrush.manifest import ManifestEntry, ManifestJournal
+from canvasbrush.pagination import ParallelPaginatedList
+from canvasbrush.requester import BrushRequester
+from canvasbrush.http_cache import MAX_BYTES, HttpCache
+from canvasbrush.rate_limit import RateLimiter
+from canvasbrush.upload_cache import UploadCache
+from canvasbrush.upload_journal import UploadJournal
+from canvasbrush.zipstream import ZipStream
 
 
 class Brush(Canvas):
@@ -14,6 +40,40 @@ class Brush(Canvas):
         super().__init__(api_url, api_key)
         self.student_name: str = config["student_name"]
         self.course_map: list = config["course_map"]
+        self.fan_out: int = config.get("fan_out", 4)
+        self.cache_dir: str = config.get("cache_dir") or default_cache_dir()
+        self.upload_cache = UploadCache(os.path.join(self.cache_dir, "uploads.json"))
+        self.upload_journal = UploadJournal(
+            os.path.join(self.cache_dir, "upload_journal.json")
+        )
+
+        http_cache = config.get("http_cache", {})
+        rate_limit = config.get("rate_limit", {})
+        requester = self._Canvas__requester
+        self._requester = BrushRequester(
+            requester.original_url,
+            requester.access_token,
+            cache=HttpCache(
+                os.path.join(self.cache_dir, "http"),
+                http_cache.get("max_bytes", MAX_BYTES),
+                http_cache.get("ttl"),
+            )
+            if http_cache is not False
+            else None,
+            rate_limiter=RateLimiter(**rate_limit) if rate_limit is not False else None,
+        )
+        self._Canvas__requester = self._requester
+
+        self.offline = False
+        self._mirror = None
+        self._course_index: Optional[TrigramIndex] = None
+        self._assignment_indexes: dict[int, AssignmentIndex] = {}
+        self._quiz_points: dict[int, dict[int, float]] = {}
+
+    def forget(self):
+        """Drops the assignments and quiz points kept from earlier calls."""
+        self._assignment_indexes.clear()
+        self._quiz_points.clear()
 
     def student_name_variations(self):
         name = self.student_name.lower()
@@ -24,15 +84,44 @@ class Brush(Canvas):
             name.replace(" ", "-"),
         ]
 
+    def course_index(self):
+        """Returns an index of every configured course alias."""
+        if self._course_index is None:
+            self._course_index = TrigramIndex(
+                (alias, course)
+                for course in self.course_map
+                for alias in course["aliases"]
+            )
+
+        return self._course_index
+
+    def find_course(self, course_string: str):
+        """Finds the configured course a user-provided string refers to.
+
+        Only an alias equal to the string counts, since whatever is resolved
+        here may be submitted to; similar aliases are left to
+        `suggest_courses`. Returns its entry in `course_map`, or None.
+        """
+        return self.course_index().get(course_string)
+
     def resolve_course(self, course_string: str):
         """Resolves a course ID from a user-provided string."""
-        for course in self.course_map:
-            if course_string.lower() in course["aliases"]:
-                return self.get_course(course["id"])
+        course = self.find_course(course_string)
+        if not course:
+            raise ValueError("invalid course provided")
 
-        raise ValueError("invalid course provided")
+        if self.offline:
+            return self.mirror.course(self._requester, course["id"])
+        return self.get_course(course["id"])
 
-    def resolve_course_from_filename(self, filename: str):
+    def suggest_courses(self, course_string: str, limit: int = 3):
+        """Returns the aliases most similar to `course_string`."""
+        return [
+            alias for _, alias, _ in self.course_index().search(course_string, limit)
+        ]
+
+    def split_filename(self, filename: str):
+        """Splits a filename into its course token and assignment tokens."""
         split = re.split(
             "-|_|\.",
             lower_remove_prefixes(
@@ -40,46 +129,130 @@ class Brush(Canvas):
             ),
         )
 
-        course = self.resolve_course(split[0])
+        return (split[0], split[1:][:-1])
+
+    def resolve_course_from_filename(self, filename: str):
+        course = self.resolve_course(self.split_filename(filename)[0])
 
         return course
 
-    def resolve_assignment(self, course: Course, tokens: list[str]):
-        is_al_previous = False
-        is_previous = False
-        first_round = []
-        second_round = []
-        operative = ""
+    def paginate(self, paginated_list: PaginatedList):
+        """Fetches the pages of a list concurrently, up to `fan_out` at a time."""
+        return ParallelPaginatedList.from_list(paginated_list, self.fan_out)
+
+    @property
+    def mirror(self):
+        """The local copy of the configured courses kept by `sync`."""
+        if self._mirror is None:
+            from canvasbrush.mirror import Mirror
+
+            self._mirror = Mirror(os.path.join(self.cache_dir, "mirror.sqlite3"))
+
+        return self._mirror
+
+    def sync(self, course_ids: list = None):
+        """Updates the local mirror, yielding each course with its change counts."""
+        course_ids = (
+            course_ids
+            if course_ids is not None
+            else [course["id"] for course in self.course_map]
+        )
+
+        for course_id in course_ids:
+            course = self.get_course(course_id)
+            yield (
+                course_id,
+                *self.mirror.sync_course(course, self.paginate, course_id),
+            )
+
+    def course_assignments(self, course: Course, order_by: str = None):
+        """Lists a course's assignments with their submissions.
+
+        Answers from the mirror when offline, and from Canvas otherwise.
+        """
+        if self.offline:
+            return self.mirror.assignments(
+                self._requester, course.id, order_by or "position"
+            )
+
+        kwargs: dict[str, Any] = {"include": ["submission"]}
+        if order_by:
+            kwargs["order_by"] = order_by
+
+        return self.paginate(self.assignment_records(course.id, **kwargs))
+
+    def assignment_records(self, course_id, **kwargs):
+        """Lists a course's assignments as compact records.
+
+        Takes the same arguments as :meth:`canvasapi.course.Course.get_assignments`.
+        """
+        return PaginatedList(
+            AssignmentRecord,
+            self._requester,
+            "GET",
+            f"courses/{course_id}/assignments",
+            _kwargs=combine_kwargs(**kwargs),
+        )
+
+    def assignment_index(self, course: Course):
+        """Returns the assignment index for a course, fetching it only once."""
+        index = self._assignment_indexes.get(course.id)
+        if index is None:
+            index = AssignmentIndex(self.course_assignments(course))
+            self._assignment_indexes[course.id] = index
+
+        return index
+
+    def assignment_tokens(self, course_ids: list = None):
+        """Returns the short forms of every course's assignments, by course ID.
+
+        The assignments of every course are fetched concurrently, from the
+        mirror when offline.
+        """
+        course_ids = (
+            course_ids
+            if course_ids is not None
+            else [course["id"] for course in self.course_map]
+        )
+
+        def tokens(course_id):
+            course = Course(self._requester, {"id": course_id})
+            return self.assignment_index(course).tokens()
+
+        with ThreadPoolExecutor(max_workers=self.fan_out) as executor:
+            return dict(zip(course_ids, executor.map(tokens, course_ids)))
+
+    def quiz_points(self, course_id: int):
+        """Returns the points possible of every quiz in a course, by quiz ID.
 
+        The quizzes of a course are listed once and shared by every later
+        call, instead of fetching each quiz on its own.
+        """
+        points = self._quiz_points.get(course_id)
+        if points is None and self.offline:
+            points = self._quiz_points[course_id] = self.mirror.quiz_points(course_id)
+        elif points is None:
+            course = Course(self._requester, {"id": course_id})
+            points = {
+                quiz.id: quiz.points_possible
+                for quiz in self.paginate(course.get_quizzes())
+            }
+            self._quiz_points[course_id] = points
+
+        return points
+
+    def resolve_assignment(self, course: Course, tokens: list[str]):
         if len(tokens) == 0:
             raise ValueError("empty string passed for assignment ID resolution")
 
+        index = self.assignment_index(course)
         last_token = tokens[len(tokens) - 1]
 
-        if tokens[0].startswith("act"):
-            for assignment in course.get_assignments(include=["submission"]):
-                split = assignment.name.lower().split()
-                if split[0] == "activity" or split[0] == "actividad":
-                    operative = tokens[0]
-                    first_round.append(assignment)
-        elif tokens[0].startswith("exc"):
-            for assignment in course.get_assignments(include=["submission"]):
-                split = assignment.name.lower().split()
-                if split[0] == "exercise" or split[0] == "exc":
-                    operative = tokens[0]
-                    first_round.append(assignment)
-        elif tokens[0].startswith("rto"):
-            for assignment in course.get_assignments(include=["submission"]):
-                split = assignment.name.lower().split()
-                if split[0] == "challenge" or split[0] == "ch":
-                    operative = tokens[0]
-                    first_round.append(assignment)
-        elif tokens[0].startswith("evi"):
-            for assignment in course.get_assignments(include=["submission"]):
-                split = assignment.name.lower().split()
-                if split[0] == "evidence" or split[0] == "evi" or split[0] == "evc":
-                    operative = tokens[0]
-                    first_round.append(assignment)
+        family = next(
+            (f for f in ("act", "exc", "rto", "evi") if tokens[0].startswith(f)),
+            None,
+        )
+        operative = tokens[0] if family and index.has_family(family) else ""
 
         if not operative or last_token == "noassump":
             look_for = (
@@ -88,121 +261,534 @@ class Brush(Canvas):
                 else " ".join(tokens[:-1]).lower()
             )
 
-            for assignment in course.get_assignments(include=["submission"]):
-                if look_for in assignment.name.lower():
-                    return assignment
+            assignment = index.search(look_for)
+            if assignment:
+                return assignment
 
             raise ValueError("no valid assignment was found for string")
 
-        for candidate in first_round:
-            split = candidate.name.lower().split()[:-1]
-
-            splitwork = " ".join(split)
-            if "prev" in tokens:
-                if "previous" in splitwork or "previus" in splitwork:
-                    if (
-                        "previous to topic" in splitwork
-                        or "previus to topic" in splitwork
-                    ):
-                        second_round.append(candidate)
-                        is_al_previous = True
-                    else:
-                        second_round.append(candidate)
-                        is_previous = True
-            else:
-                if "previous" in splitwork or "previus" in splitwork:
-                    pass
-                else:
-                    second_round.append(candidate)
-                    is_previous = False
-
-        for candidate in second_round:
-            split = candidate.name.lower().split()[1:]
-
-            if is_previous:
-                sub_split = split[1:]
-            elif is_al_previous:
-                sub_split = split[3:]
-            else:
-                sub_split = split[:]
+        try:
+            number = number_from_end(operative)
+        except ValueError:
+            number = None
 
-            if len(sub_split) > 0:
-                try:
-                    if number_from_end(operative) == int(
-                        re.sub("[^0-9]", "", sub_split[0])
-                    ):
-                        return candidate
-                except ValueError:
-                    pass
+        if number is not None:
+            assignment = index.lookup(family, number, previous="prev" in tokens)
+            if assignment:
+                return assignment
 
         raise ValueError("no valid assignment was found winner for string")
 
     def resolve_assignment_from_filename(self, filename: str, course: Course = None):
-        split = re.split(
-            "-|_|\.",
-            lower_remove_prefixes(
-                filename, self.student_name_variations() + ["-", "_"]
-            ),
-        )[1:][:-1]
+        course_token, tokens = self.split_filename(filename)
 
         if not course:
-            course = self.resolve_course_from_filename(filename)
-
-        return self.resolve_assignment(course, split)
-
-    def bulk_submit(self, assignments: list[AssignmentPlusFile], comment: str):
-        """Submit files to Canvas in bulk."""
-        blacklisted: list[AssignmentPlusFile] = []
-        pairings: list[list[AssignmentPlusFile]] = []
-
-        for i, upper in enumerate(assignments):
-            if len(blacklisted) == len(assignments):
-                break
-
-            if not upper in blacklisted:
-                pair = [upper]
-                for j, lower in enumerate(assignments):
-                    if not lower in blacklisted:
-                        if (
-                            upper.assignment.course_id == lower.assignment.course_id
-                            and upper.assignment.id == lower.assignment.id
-                            and i != j
-                        ):
-                            pair.append(lower)
-                            blacklisted.append(lower)
-                pairings.append(pair)
-                blacklisted.append(upper)
-
-        for pair in pairings:
-            ids = []
-            for apf in pair:
-                id = Uploader(
-                    apf.assignment._requester,
-                    f"courses/{apf.assignment.course_id}/assignments/{apf.assignment.id}/submissions/self/files",
-                    apf.file_path,
-                    submit_assignment=False,
-                ).start()
-
-                ids.append(id[1]["id"])
-
-                yield id
+            course = self.resolve_course(course_token)
+
+        return self.resolve_assignment(course, tokens)
+
+    def plan_submissions(self, filenames: list[str]):
+        """Resolves the assignments a batch of files are meant for.
+
+        Every filename is parsed first, each course they name is resolved
+        once, and the assignments of all of those courses are fetched
+        concurrently, so that the whole batch is resolved against a single
+        snapshot before anything is uploaded. Returns the assignments in the
+        order of `filenames`, and raises ValueError naming the first file
+        that cannot be resolved.
+        """
+        parsed = [self.split_filename(filename) for filename in filenames]
+
+        courses: dict[str, Course] = {}
+        by_id: dict[str, Course] = {}
+        for filename, (course_token, _) in zip(filenames, parsed):
+            if course_token in courses:
+                continue
+
+            entry = self.find_course(course_token)
+            if not entry:
+                raise ValueError(f"invalid course provided for {filename}")
+            if entry["id"] not in by_id:
+                by_id[entry["id"]] = self.resolve_course(course_token)
+            courses[course_token] = by_id[entry["id"]]
+
+        with ThreadPoolExecutor(max_workers=self.fan_out) as executor:
+            list(executor.map(self.assignment_index, by_id.values()))
+
+        assignments = []
+        for filename, (course_token, tokens) in zip(filenames, parsed):
+            try:
+                assignments.append(
+                    self.resolve_assignment(courses[course_token], tokens)
+                )
+            except ValueError as e:
+                raise ValueError(f"{e}: {filename}")
+
+        return assignments
+
+    def preflight(self, assignments: list[Assignment], allow_resubmit: bool = True):
+        """Checks that a batch of assignments can be submitted to.
+
+        Everything is judged from the assignments as they were fetched, with
+        their submission included, so checking costs no requests. Only the
+        assignments that were fetched without it have their submissions
+        listed, with a single request per course. Returns a list of
+        `(assignment, problem, blocking)` tuples for the assignments with
+        something to report: ones that are locked, do not take file uploads
+        or, unless `allow_resubmit` is set, were already submitted block
+        their submission, while a due date that has passed only warns.
+        """
+        unique = list(
+            {assignment.id: assignment for assignment in assignments}.values()
+        )
 
-            yield (
-                pair[0].assignment.submit(
-                    {
-                        "submission_type": "online_upload",
-                        "file_ids": ids,
-                    },
-                    None,
-                    **{"comment[text_comment]": comment},
+        states: dict[int, str] = {}
+        missing: dict[int, list[int]] = {}
+        for assignment in unique:
+            submission = getattr(assignment, "submission", None)
+            if submission is not None:
+                states[assignment.id] = submission["workflow_state"]
+            else:
+                missing.setdefault(assignment.course_id, []).append(assignment.id)
+
+        if not allow_resubmit and not self.offline:
+            for course_id, assignment_ids in missing.items():
+                course = Course(self._requester, {"id": course_id})
+                for submission in self.paginate(
+                    course.get_multiple_submissions(
+                        student_ids=["self"], assignment_ids=assignment_ids
+                    )
+                ):
+                    states[submission.assignment_id] = submission.workflow_state
+
+        now = datetime.now(timezone.utc)
+        problems = []
+        for assignment in unique:
+            lock_at = getattr(assignment, "lock_at", None)
+            submitted = states.get(assignment.id, "unsubmitted") != "unsubmitted"
+
+            if getattr(assignment, "locked_for_user", False) or (
+                lock_at and datetime.fromisoformat(lock_at.replace("Z", "+00:00")) < now
+            ):
+                problems.append((assignment, "it is locked", True))
+            elif "online_upload" not in (
+                getattr(assignment, "submission_types", None) or []
+            ):
+                problems.append((assignment, "it does not take file uploads", True))
+            elif submitted and not allow_resubmit:
+                problems.append((assignment, "it was already submitted", True))
+            elif self._deadline(assignment, now)[0] == 1:
+                problems.append((assignment, "its due date has passed", False))
+
+        return problems
+
+    def manifest_journal(self, manifest_path: str):
+        """Returns the journal of the entries of a manifest already submitted."""
+        name = hashlib.sha256(os.path.abspath(manifest_path).encode()).hexdigest()
+        return ManifestJournal(os.path.join(self.cache_dir, "manifests", name[:16]))
+
+    def submit_manifest(
+        self,
+        entries,
+        journal: ManifestJournal,
+        comment: str = None,
+        batch_size: int = 64,
+        skip_invalid: bool = False,
+        allow_resubmit: bool = True,
+    ):
+        """Submits the entries of a manifest as they are read, a batch at a time.
+
+        Only `batch_size` entries are resolved and uploaded at once, so memory
+        stays the same however long the manifest is. A batch is never cut
+        between consecutive entries for the same assignment, which are
+        submitted together. Every submission is recorded in `journal` as
+        soon as Canvas accepts it, and the entries it already holds are
+        skipped, so an interrupted run resumes where it stopped.
+
+        Each batch is checked with :meth:`preflight` before it is uploaded.
+        Yields `("skipped", entry)` for entries already submitted,
+        `("invalid", entry, error)` for entries that cannot be resolved or
+        submitted to when `skip_invalid` is set (they raise ValueError
+        otherwise), `("upload", result)` for every finished upload,
+        and `("submitted", entries, assignment, submission)` for every
+        submission.
+        """
+        courses: dict[str, Course] = {}
+        batch: list[ManifestEntry] = []
+        last = None
+
+        for entry in entries:
+            if entry in journal:
+                yield ("skipped", entry)
+                continue
+
+            target = self._manifest_target(entry)
+            if len(batch) >= batch_size and target != last:
+                yield from self._submit_manifest_batch(
+                    batch, journal, comment, courses, skip_invalid, allow_resubmit
                 )
-                if comment
-                else pair[0].assignment.submit(
-                    {
-                        "submission_type": "online_upload",
-                        "file_ids": ids,
-                    }
+                batch = []
+
+            batch.append(entry)
+            last = target
+
+        if batch:
+            yield from self._submit_manifest_batch(
+                batch, journal, comment, courses, skip_invalid, allow_resubmit
+            )
+
+    def _manifest_target(self, entry: ManifestEntry):
+        """Returns what a manifest entry says it is submitted to."""
+        if entry.course is not None and entry.assignment is not None:
+            return (entry.course, str(entry.assignment))
+
+        course_token, tokens = self.split_filename(entry.filename)
+        return (entry.course or course_token, str(entry.assignment or tokens))
+
+    def _resolve_manifest_entry(self, entry: ManifestEntry, courses: dict):
+        import validators
+
+        if not validators.url(entry.resource) and not os.path.exists(entry.resource):
+            raise ValueError("file does not exist")
+
+        course_token, tokens = self.split_filename(entry.filename)
+
+        course = self.find_course(entry.course or course_token)
+        if not course:
+            raise ValueError("invalid course provided")
+        course = courses[course["id"]]
+
+        if entry.assignment is None:
+            return self.resolve_assignment(course, tokens)
+
+        if isinstance(entry.assignment, int) or entry.assignment.isdigit():
+            assignment = self.assignment_index(course).get(int(entry.assignment))
+            if assignment is None:
+                raise ValueError("no assignment has that ID")
+            return assignment
+
+        tokens = entry.assignment.lower().split()
+        try:
+            return self.resolve_assignment(course, tokens)
+        except ValueError:
+            return self.resolve_assignment(course, tokens + ["noassump"])
+
+    def _submit_manifest_batch(
+        self,
+        batch: list[ManifestEntry],
+        journal: ManifestJournal,
+        comment: Optional[str],
+        courses: dict,
+        skip_invalid: bool,
+        allow_resubmit: bool,
+    ):
+        # the courses of a batch are resolved first, so that the assignments
+        # of every course it names for the first time can be fetched at once
+        new = []
+        for entry in batch:
+            course_string = self._manifest_target(entry)[0]
+            course = self.find_course(course_string)
+            if course and course["id"] not in courses:
+                courses[course["id"]] = self.resolve_course(course_string)
+                new.append(courses[course["id"]])
+
+        with ThreadPoolExecutor(max_workers=self.fan_out) as executor:
+            list(executor.map(self.assignment_index, new))
+
+        resolved = []
+        for entry in batch:
+            try:
+                resolved.append((entry, self._resolve_manifest_entry(entry, courses)))
+            except ValueError as e:
+                if not skip_invalid:
+                    raise ValueError(f"{e}: {entry}")
+                yield ("invalid", entry, e)
+
+        blocked = {
+            assignment.id: problem
+            for assignment, problem, blocking in self.preflight(
+                [assignment for _, assignment in resolved], allow_resubmit
+            )
+            if blocking
+        }
+
+        submissions: list[AssignmentPlusFile] = []
+        by_assignment: dict[int, tuple] = {}
+        for entry, assignment in resolved:
+            if assignment.id in blocked:
+                error = ValueError(
+                    f"cannot submit to {assignment.name}: {blocked[assignment.id]}"
                 )
+                if not skip_invalid:
+                    raise ValueError(f"{error}: {entry}")
+                yield ("invalid", entry, error)
+                continue
+
+            resource: str | ZipStream = entry.resource
+            if os.path.isdir(entry.resource):
+                resource = ZipStream(entry.resource)
+
+            submissions.append(AssignmentPlusFile(assignment, resource, entry.comment))
+            by_assignment.setdefault(assignment.id, (assignment, []))[1].append(entry)
+
+        if not submissions:
+            return
+
+        for result in self.bulk_submit(submissions, comment, self.fan_out):
+            if isinstance(result, tuple):
+                yield ("upload", result)
+            elif result is not True:
+                assignment, entries = by_assignment[result.assignment_id]
+                journal.record(entries, result.id)
+                yield ("submitted", entries, assignment, result)
+
+    def agenda(self, course_ids: list = None, within: float = None, unsubmitted=False):
+        """Yields the assignments of several courses, ordered by due date.
+
+        Every course is fetched concurrently and sorted by due date here,
+        since the dates Canvas sorts by are not always the ones that apply to
+        the student, and the sorted courses are merged with a heap. When
+        offline, the mirror answers the whole query instead.
+        Assignments without a due date are left out, with `within` so are the
+        ones not due in the next that many hours, and with `unsubmitted` the
+        ones that are submitted or locked. Each item is a
+        `(course_id, assignment)` tuple.
+        """
+        course_ids = (
+            course_ids
+            if course_ids is not None
+            else [course["id"] for course in self.course_map]
+        )
+
+        if self.offline:
+            for assignment in self.mirror.due_within(
+                self._requester, within, course_ids, unsubmitted
+            ):
+                yield (assignment.course_id, assignment)
+            return
+
+        now = datetime.now(timezone.utc)
+        until = now + timedelta(hours=within) if within is not None else None
+
+        def fetch(course_id):
+            return sorted(
+                (
+                    (assignment.due_at_date, course_id, assignment)
+                    for assignment in self.paginate(
+                        self.assignment_records(course_id, include=["submission"])
+                    )
+                    if assignment.due_at
+                    and (not unsubmitted or self._unsubmitted(assignment))
+                ),
+                key=lambda item: item[0],
             )
 
+        with ThreadPoolExecutor(max_workers=self.fan_out) as executor:
+            courses = list(executor.map(fetch, course_ids))
+
+        for due, course_id, assignment in heapq.merge(*courses, key=lambda i: i[0]):
+            if until is not None and due > until:
+                return
+            if until is None or due >= now:
+                yield (course_id, assignment)
+
+    @staticmethod
+    def _unsubmitted(assignment):
+        """Whether an assignment is open and unsubmitted, like the mirror's filter."""
+        submission = getattr(assignment, "submission", None) or {}
+        return (
+            submission.get("workflow_state", "unsubmitted") == "unsubmitted"
+            and not assignment.locked_for_user
+        )
+
+    def bulk_submit(
+        self,
+        assignments: list[AssignmentPlusFile],
+        comment: Optional[str],
+        max_workers: int = 4,
+    ):
+        """Submit files to Canvas in bulk.
+
+        Files are grouped by assignment and uploaded through a bounded pool of
+        workers. Every finished upload is yielded as soon as it completes, each
+        assignment is submitted as soon as all of its files are uploaded, and
+        True is yielded once everything has been submitted. A comment set on
+        any of an assignment's files is used instead of `comment`.
+
+        Work is started in order of urgency rather than in the order given:
+        submitting an assignment whose files are all uploaded comes first,
+        then the files of assignments that can still be handed in on time,
+        earliest deadline first, and then the ones that are already late,
+        earliest lock first. Smaller assignments, and smaller files within
+        them, go first when deadlines tie, so that as few as possible end up
+        late when the pool is slower than the batch is long.
+        """
+        pairings: dict[tuple, list[AssignmentPlusFile]] = {}
+        for apf in assignments:
+            key = (apf.assignment.course_id, apf.assignment.id)
+            pairings.setdefault(key, []).append(apf)
+
+        now = datetime.now(timezone.utc)
+        queued: list[tuple] = []
+        priorities: dict[tuple, tuple] = {}
+        file_ids: dict[tuple, list] = {}
+        remaining: dict[tuple, int] = {}
+        order = itertools.count()
+
+        for key, pair in pairings.items():
+            sizes = [self._submission_size(apf) for apf in pair]
+            priorities[key] = (*self._deadline(pair[0].assignment, now), sum(sizes))
+            file_ids[key] = [None] * len(pair)
+            remaining[key] = len(pair)
+            for position, size in enumerate(sizes):
+                heapq.heappush(
+                    queued,
+                    (1, priorities[key], size, next(order), "upload", key, position),
+                )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: dict[Future, tuple] = {}
+
+            def start():
+                # only as much work as there are workers is handed to the
+                # pool, so that the queue decides what runs next
+                while queued and len(pending) < max_workers:
+                    *_, kind, key, position = heapq.heappop(queued)
+                    pair = pairings[key]
+                    if kind == "upload":
+                        future = executor.submit(
+                            self._upload_submission_file, pair[position]
+                        )
+                    else:
+                        future = executor.submit(
+                            self._submit_files,
+                            pair[0].assignment,
+                            file_ids[key],
+                            next((a.comment for a in pair if a.comment), comment),
+                        )
+                    pending[future] = (kind, key, position)
+
+            try:
+                start()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, key, position = pending.pop(future)
+                        result = future.result()
+
+                        if kind == "upload":
+                            file_ids[key][position] = result[1]["id"]
+                            remaining[key] -= 1
+
+                            if remaining[key] == 0:
+                                heapq.heappush(
+                                    queued,
+                                    (
+                                        0,
+                                        priorities[key],
+                                        0,
+                                        next(order),
+                                        "submit",
+                                        key,
+                                        None,
+                                    ),
+                                )
+
+                        yield result
+                    start()
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
         yield True
+
+    def _deadline(self, assignment: Assignment, now: datetime):
+        """Returns how urgent submitting to an assignment is, most urgent first.
+
+        Assignments that can still be handed in on time come first, by the
+        earlier of their due and lock dates, then the ones already late, by
+        their lock date, and then the ones without a deadline.
+        """
+        due, lock = (
+            datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+            for value in (
+                getattr(assignment, "due_at", None),
+                getattr(assignment, "lock_at", None),
+            )
+        )
+        never = datetime.max.replace(tzinfo=timezone.utc)
+
+        if due is not None and due < now:
+            return (1, lock or never)
+        if due is None and lock is None:
+            return (2, never)
+
+        return (0, min(date for date in (due, lock) if date))
+
+    def _submission_size(self, apf: AssignmentPlusFile):
+        """Returns the size of a file to submit, or 0 when it is not known yet."""
+        if isinstance(apf.file_path, str) and os.path.isfile(apf.file_path):
+            return os.path.getsize(apf.file_path)
+
+        return 0
+
+    def _upload_scope(self, assignment: Assignment):
+        """Identifies where, and as whom, a submission file is uploaded."""
+        requester = assignment._requester
+        user = hashlib.sha256(requester.access_token.encode()).hexdigest()[:16]
+        return f"{requester.base_url}courses/{assignment.course_id}/assignments/{assignment.id}/submissions/{user}"
+
+    def _upload_submission_file(self, apf: AssignmentPlusFile):
+        """Uploads a submission file, reusing a previous upload of the same bytes."""
+        digest = journal_key = None
+        if isinstance(apf.file_path, ZipStream):
+            digest, size = apf.file_path.measure()
+        elif os.path.isfile(apf.file_path):
+            digest, size = sha256_file(apf.file_path)
+
+        if digest:
+            scope = self._upload_scope(apf.assignment)
+            file_id = self.upload_cache.get(digest, size, scope)
+            if file_id is not None:
+                return (True, {"id": file_id, "cached": True})
+            journal_key = f"{scope}|{digest}:{size}"
+
+        result = Uploader(
+            apf.assignment._requester,
+            f"courses/{apf.assignment.course_id}/assignments/{apf.assignment.id}/submissions/self/files",
+            apf.file_path,
+            journal=self.upload_journal,
+            journal_key=journal_key,
+            submit_assignment=False,
+        ).start()
+
+        if digest and result[0]:
+            self.upload_cache.put(digest, size, scope, result[1]["id"])
+
+        return result
+
+    def _submit_files(self, assignment: Assignment, ids: list, comment: str):
+        submission = {
+            "submission_type": "online_upload",
+            "file_ids": ids,
+        }
+
+        # a submit that timed out may still have been accepted, and making it
+        # again would submit twice, so only the errors Canvas answers before
+        # acting on it are retried
+        try:
+            return retry(
+                lambda: (
+                    assignment.submit(
+                        submission, None, **{"comment[text_comment]": comment}
+                    )
+                    if comment
+                    else assignment.submit(submission)
+                ),
+                transient=was_not_processed,
+            )
+        except CanvasException:
+            # a cached file may have been deleted from Canvas since it was
+            # uploaded, so the next run should upload these files again
+            self.upload_cache.forget(self._upload_scope(assignment), ids)
+            raise
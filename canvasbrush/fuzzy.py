@@ -0,0 +1,106 @@
+import re
+import heapq
+from itertools import chain
+from typing import Sequence
+from collections import Counter, defaultdict
+
+# this module only depends on the standard library, so that shell completion
+# can use it without importing canvasapi
+
+
+def normalize(text: str):
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+def trigrams(text: str):
+    """Returns the set of trigrams of a normalized, padded string."""
+    padded = f"  {normalize(text)} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """An index of names that finds them by substring or by similarity.
+
+    Every name is broken into trigrams, and each trigram lists the names it
+    appears in, so a query only ever looks at names that share something
+    with it instead of scanning all of them. Names keep the order they were
+    added in, which breaks ties.
+    """
+
+    def __init__(self, entries=()):
+        """
+        :param entries: `(name, value)` pairs to index.
+        :type entries: iterable
+        """
+        self.names: list[str] = []
+        self.values: list = []
+        self._sizes: list[int] = []
+        self._exact: dict[str, int] = {}
+        self._postings: dict[str, list[int]] = defaultdict(list)
+
+        for name, value in entries:
+            self.add(name, value)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name: str, value):
+        position = len(self.names)
+        self.names.append(normalize(name))
+        self.values.append(value)
+        self._exact.setdefault(self.names[position], position)
+
+        grams = trigrams(name)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(position)
+
+    def get(self, name: str):
+        """Returns the value of the first name equal to `name`."""
+        position = self._exact.get(normalize(name))
+        return self.values[position] if position is not None else None
+
+    def contains(self, query: str):
+        """Returns the value of the first name that contains `query`."""
+        query = normalize(query)
+
+        # a name can only contain the query if it has every one of the
+        # query's inner trigrams, so the rarest of them narrows the search
+        grams = [query[i : i + 3] for i in range(len(query) - 2)]
+        candidates: Sequence[int]
+        if grams:
+            candidates = min((self._postings.get(g, []) for g in grams), key=len)
+        else:
+            candidates = range(len(self.names))
+
+        for position in candidates:
+            if query in self.names[position]:
+                return self.values[position]
+
+        return None
+
+    def search(self, query: str, limit: int = 5, threshold: float = 0.3):
+        """Ranks names by how similar they are to `query`.
+
+        Returns up to `limit` `(score, name, value)` tuples, best first, with
+        the Dice coefficient of their trigrams as the score. Names scoring
+        below `threshold` are left out.
+        """
+        grams = trigrams(query)
+        shared = Counter(
+            chain.from_iterable(self._postings.get(gram, ()) for gram in grams)
+        )
+
+        ranked = heapq.nsmallest(
+            limit,
+            (
+                (-2 * count / (len(grams) + self._sizes[position]), position)
+                for position, count in shared.items()
+            ),
+        )
+
+        return [
+            (-score, self.names[position], self.values[position])
+            for score, position in ranked
+            if -score >= threshold
+        ]
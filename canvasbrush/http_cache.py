@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+
+MAX_BYTES = 64 * 1024 * 1024
+
+# seconds during which a response is served without asking Canvas at all,
+# by endpoint. anything else is revalidated on every request.
+DEFAULT_TTLS = {
+    r"^courses/[^/]+$": 60 * 60,
+    r"^courses/[^/]+/quizzes(/[^/]+)?$": 10 * 60,
+}
+
+
+class HttpCache:
+    """An on-disk, size-bounded LRU cache of Canvas GET responses.
+
+    Bodies are stored with the `ETag` and `Last-Modified` validators Canvas
+    sent for them, so stale entries can be revalidated with a conditional
+    request and refreshed by a 304 instead of a full transfer. Entries of
+    endpoints with a TTL are served without a request while they are fresh.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = MAX_BYTES, ttls: dict = None):
+        """
+        :param directory: Where to keep the cached responses.
+        :type directory: str
+        :param max_bytes: How many bytes of bodies to keep before evicting \
+            the least recently used entries.
+        :type max_bytes: int
+        :param ttls: Seconds to trust a response for without revalidating \
+            it, by regular expression over the endpoint.
+        :type ttls: dict
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in (DEFAULT_TTLS if ttls is None else ttls).items()
+        ]
+        self._lock = threading.Lock()
+
+        try:
+            with open(self._path("index.json"), "r") as f:
+                self._index: dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def _path(self, name: str):
+        return os.path.join(self.directory, name)
+
+    def key(self, url: str, params, user: str):
+        """Identifies a request by its URL, parameters and user."""
+        return hashlib.sha256(repr((url, params, user)).encode()).hexdigest()
+
+    def ttl(self, endpoint: str):
+        """Returns how long a response from `endpoint` stays fresh."""
+        for pattern, ttl in self.ttls:
+            if pattern.search(endpoint):
+                return ttl
+
+        return 0
+
+    def get(self, key: str):
+        """Returns the metadata of a cached response, if there is one."""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry:
+                entry["used_at"] = time.time()
+
+            return entry
+
+    def is_fresh(self, entry: dict):
+        return time.time() - entry["stored_at"] < entry["ttl"]
+
+    def validators(self, entry: dict):
+        """Returns the headers that revalidate a cached response."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def response(self, key: str, entry: dict):
+        """Rebuilds a :class:`requests.Response` from a cached entry."""
+        try:
+            with open(self._path(f"{key}.body"), "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = entry["url"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = "utf-8"
+        response._content = body
+
+        return response
+
+    def refresh(self, key: str):
+        """Marks a cached response as just revalidated."""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry:
+                entry["stored_at"] = time.time()
+                self._save()
+
+    def put(self, key: str, endpoint: str, response: requests.Response):
+        """Stores a response if it can be revalidated or has a TTL."""
+        ttl = self.ttl(endpoint)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (ttl or etag or last_modified):
+            return
+
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            with open(self._path(f"{key}.body"), "wb") as f:
+                f.write(body)
+
+            now = time.time()
+            self._index[key] = {
+                "url": response.url,
+                "headers": {
+                    name: value
+                    for name, value in response.headers.items()
+                    if name.lower() in ("content-type", "link", "etag", "last-modified")
+                },
+                "etag": etag,
+                "last_modified": last_modified,
+                "ttl": ttl,
+                "size": len(body),
+                "stored_at": now,
+                "used_at": now,
+            }
+
+            self._evict()
+            self._save()
+
+    def expire(self):
+        """Makes every entry revalidate before it is used again."""
+        with self._lock:
+            for entry in self._index.values():
+                entry["stored_at"] = 0
+            self._save()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["used_at"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index.pop(key)["size"]
+            try:
+                os.remove(self._path(f"{key}.body"))
+            except OSError:
+                pass
+
+    def _save(self):
+        if not os.path.isdir(self.directory):
+            return
+        tmp = self._path(f"index.json.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._path("index.json"))
@@ -0,0 +1,158 @@
+import os
+import json
+import hashlib
+from typing import Optional, TextIO
+
+
+class ManifestEntry:
+    """One submission listed in a manifest."""
+
+    def __init__(
+        self,
+        line: int,
+        digest: str,
+        resource: str,
+        course: str = None,
+        assignment=None,
+        comment: str = None,
+        occurrence: int = 0,
+    ):
+        """
+        :param line: The line of the manifest the entry is on.
+        :type line: int
+        :param digest: A hash of the line, to tell if it changed between runs.
+        :type digest: str
+        :param resource: The path or URL of the file to submit.
+        :type resource: str
+        :param course: The course to submit to. Taken from the file name \
+            when missing.
+        :type course: str
+        :param assignment: The name or ID of the assignment to submit to. \
+            Taken from the file name when missing.
+        :type assignment: str or int
+        :param comment: The comment to go with the submission, if any.
+        :type comment: str
+        :param occurrence: How many earlier lines of the manifest have the \
+            same text, to tell repeated lines apart.
+        :type occurrence: int
+        """
+        self.line = line
+        self.digest = digest
+        self.resource = resource
+        self.course = course
+        self.assignment = assignment
+        self.comment = comment
+        self.occurrence = occurrence
+
+    def __str__(self):
+        return f"line {self.line} ({self.filename})"
+
+    @property
+    def filename(self):
+        """The name the file is submitted under, which may name its assignment."""
+        if os.path.isdir(self.resource):
+            return f"{os.path.basename(os.path.abspath(self.resource))}.zip"
+
+        return os.path.basename(self.resource.split("?")[0])
+
+    @property
+    def key(self):
+        return (self.digest, self.occurrence)
+
+
+def read_manifest(path: str):
+    """Yields the entries of a JSON Lines manifest as it is read.
+
+    Each line is an object with a `path` or `url`, and optionally the
+    `course`, `assignment` and `comment` to submit it with. Relative paths
+    are taken from the manifest's directory, and blank lines are skipped.
+    Raises ValueError on the first line that is not a valid entry.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    seen: dict[str, int] = {}
+
+    with open(path, "r") as f:
+        for number, line in enumerate(f, start=1):
+            text = line.strip()
+            if not text:
+                continue
+
+            try:
+                data = json.loads(text)
+            except ValueError as e:
+                raise ValueError(f"line {number} of the manifest is not JSON: {e}")
+
+            if not isinstance(data, dict) or not (data.get("path") or data.get("url")):
+                raise ValueError(f"line {number} of the manifest has no path or url")
+
+            resource = data.get("url") or os.path.join(directory, data["path"])
+            digest = hashlib.sha256(text.encode()).hexdigest()[:16]
+            seen[digest] = seen.get(digest, -1) + 1
+            yield ManifestEntry(
+                number,
+                digest,
+                resource,
+                data.get("course"),
+                data.get("assignment"),
+                data.get("comment"),
+                seen[digest],
+            )
+
+
+class ManifestJournal:
+    """An on-disk record of the manifest entries already submitted.
+
+    Entries are appended as each submission is accepted and flushed to disk
+    straight away, so an interrupted run loses nothing it finished, and
+    writing stays cheap however many entries the manifest has. An entry is
+    known by the hash of its text and how many times that text came before
+    it, so lines can be added or removed around it without it being submitted
+    again, while editing it does.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._done: set[tuple] = set()
+        self._file: Optional[TextIO] = None
+        self._torn = False
+
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    self._torn = not line.endswith("\n")
+                    try:
+                        self._done.add(tuple(json.loads(line)["entry"]))
+                    except (ValueError, KeyError, TypeError):
+                        # the last line is cut short if a run was killed
+                        # while writing it
+                        continue
+        except OSError:
+            pass
+
+    def __contains__(self, entry: ManifestEntry):
+        return entry.key in self._done
+
+    def __len__(self):
+        return len(self._done)
+
+    def record(self, entries: list[ManifestEntry], submission_id: int):
+        """Records that `entries` were submitted together."""
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a")
+            if self._torn:
+                self._file.write("\n")
+
+        for entry in entries:
+            self._done.add(entry.key)
+            self._file.write(
+                json.dumps({"entry": entry.key, "submission": submission_id}) + "\n"
+            )
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
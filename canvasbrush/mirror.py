@@ -0,0 +1,325 @@
+import os
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from canvasapi.course import Course
+from canvasbrush.assignment_record import AssignmentRecord
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    synced_at TEXT
+);
+CREATE TABLE IF NOT EXISTS assignments (
+    id INTEGER PRIMARY KEY,
+    course_id TEXT NOT NULL,
+    position INTEGER,
+    name TEXT NOT NULL,
+    due_at TEXT,
+    lock_at TEXT,
+    locked_for_user INTEGER,
+    lock_explanation TEXT,
+    grading_type TEXT,
+    submission_types TEXT,
+    quiz_id INTEGER,
+    points_possible REAL,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS assignments_course ON assignments (course_id, position);
+CREATE INDEX IF NOT EXISTS assignments_due ON assignments (due_at);
+CREATE TABLE IF NOT EXISTS submissions (
+    assignment_id INTEGER PRIMARY KEY,
+    workflow_state TEXT,
+    submitted_at TEXT,
+    graded_at TEXT,
+    grade TEXT,
+    score REAL
+);
+CREATE INDEX IF NOT EXISTS submissions_state ON submissions (workflow_state);
+CREATE TABLE IF NOT EXISTS quizzes (
+    id INTEGER PRIMARY KEY,
+    course_id TEXT NOT NULL,
+    points_possible REAL
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    course_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (course_id, kind)
+);
+"""
+
+ORDER_BY = {
+    "position": "a.position",
+    "name": "a.name",
+    "due_at": "a.due_at IS NULL, a.due_at",
+}
+
+ASSIGNMENT_COLUMNS = """
+    a.id, a.course_id, a.position, a.name, a.due_at, a.lock_at,
+    a.locked_for_user, a.lock_explanation, a.grading_type, a.submission_types,
+    a.quiz_id, a.points_possible, a.updated_at,
+    s.workflow_state, s.submitted_at, s.graded_at, s.grade, s.score
+"""
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class Mirror:
+    """A local SQLite copy of the configured courses.
+
+    `sync_course` brings a course up to date, and the query methods answer
+    from the copy without touching the network. Submissions are synced
+    incrementally from the latest `submitted_at` and `graded_at` seen.
+    Assignments are listed in full on every sync, which is what notices
+    removed ones, but only the rows that differ are rewritten. IDs are
+    stored as text and handed back as integers, like Canvas returns them.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # `brush serve` answers each command on whichever worker thread is free
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def course(self, requester, course_id):
+        """Returns a synced course, or raises ValueError if it was never synced."""
+        row = self.db.execute(
+            "SELECT id, name FROM courses WHERE id = ? AND synced_at IS NOT NULL",
+            (str(course_id),),
+        ).fetchone()
+        if not row:
+            raise ValueError("course has not been synced")
+
+        return Course(requester, {"id": int(row["id"]), "name": row["name"]})
+
+    def _watermark(self, course_id: str, kind: str):
+        row = self.db.execute(
+            "SELECT value FROM watermarks WHERE course_id = ? AND kind = ?",
+            (course_id, kind),
+        ).fetchone()
+
+        return row["value"] if row else None
+
+    def _set_watermark(self, course_id: str, kind: str, value: str):
+        if value:
+            self.db.execute(
+                "INSERT INTO watermarks (course_id, kind, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (course_id, kind) DO UPDATE SET value = excluded.value "
+                "WHERE excluded.value > watermarks.value",
+                (course_id, kind, value),
+            )
+
+    def sync_course(self, course: Course, paginate=iter, course_id=None):
+        """Brings a course up to date with Canvas.
+
+        `paginate` wraps every list request, for instance to fetch its pages
+        concurrently, and `course_id` is the ID to store the course under,
+        which defaults to the one Canvas reports. Returns how many
+        assignments changed and how many assignments had their submission
+        change.
+        """
+        course_id = str(course_id if course_id is not None else course.id)
+        started = _now()
+
+        known = {
+            row["id"]: tuple(row)
+            for row in self.db.execute(
+                "SELECT * FROM assignments WHERE course_id = ?", (course_id,)
+            )
+        }
+        seen = set()
+        assignments_changed = 0
+        for assignment in paginate(course.get_assignments()):
+            seen.add(assignment.id)
+            row = (
+                assignment.id,
+                course_id,
+                getattr(assignment, "position", None),
+                assignment.name,
+                assignment.due_at,
+                getattr(assignment, "lock_at", None),
+                int(bool(getattr(assignment, "locked_for_user", False))),
+                getattr(assignment, "lock_explanation", None),
+                getattr(assignment, "grading_type", None),
+                json.dumps(getattr(assignment, "submission_types", [])),
+                getattr(assignment, "quiz_id", None),
+                getattr(assignment, "points_possible", None),
+                getattr(assignment, "updated_at", None),
+            )
+            # lock state changes as time passes without touching updated_at,
+            # so the whole row is compared rather than just the timestamp
+            if known.get(assignment.id) == row:
+                continue
+
+            assignments_changed += 1
+            self.db.execute(
+                "INSERT OR REPLACE INTO assignments VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+
+        removed = set(known) - seen
+        if removed:
+            marks = ",".join("?" * len(removed))
+            self.db.execute(
+                f"DELETE FROM assignments WHERE id IN ({marks})", tuple(removed)
+            )
+            self.db.execute(
+                f"DELETE FROM submissions WHERE assignment_id IN ({marks})",
+                tuple(removed),
+            )
+
+        submitted_since = self._watermark(course_id, "submitted_at")
+        graded_since = self._watermark(course_id, "graded_at")
+        synced_at = self.db.execute(
+            "SELECT synced_at FROM courses WHERE id = ?", (course_id,)
+        ).fetchone()
+
+        # a course that has been synced before only needs what was submitted
+        # or graded since then. the last sync stands in for a watermark that
+        # has not been seen yet, such as before anything is graded.
+        if synced_at and synced_at["synced_at"]:
+            queries = [
+                {"submitted_since": submitted_since or synced_at["synced_at"]},
+                {"graded_since": graded_since or synced_at["synced_at"]},
+            ]
+        else:
+            queries = [{}]
+
+        # a submission can be both submitted and graded since the last sync,
+        # and then comes back from both queries
+        submissions_changed = set()
+        latest_submitted, latest_graded = submitted_since, graded_since
+        for query in queries:
+            for submission in paginate(
+                course.get_multiple_submissions(student_ids=["self"], **query)
+            ):
+                submitted_at = getattr(submission, "submitted_at", None)
+                graded_at = getattr(submission, "graded_at", None)
+                submissions_changed.add(submission.assignment_id)
+                self.db.execute(
+                    "INSERT OR REPLACE INTO submissions VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        submission.assignment_id,
+                        submission.workflow_state,
+                        submitted_at,
+                        graded_at,
+                        getattr(submission, "grade", None),
+                        getattr(submission, "score", None),
+                    ),
+                )
+                latest_submitted = max(
+                    filter(None, (latest_submitted, submitted_at)), default=None
+                )
+                latest_graded = max(
+                    filter(None, (latest_graded, graded_at)), default=None
+                )
+
+        self._set_watermark(course_id, "submitted_at", latest_submitted)
+        self._set_watermark(course_id, "graded_at", latest_graded)
+
+        self.db.execute("DELETE FROM quizzes WHERE course_id = ?", (course_id,))
+        self.db.executemany(
+            "INSERT OR REPLACE INTO quizzes VALUES (?, ?, ?)",
+            (
+                (quiz.id, course_id, quiz.points_possible)
+                for quiz in paginate(course.get_quizzes())
+            ),
+        )
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO courses VALUES (?, ?, ?)",
+            (course_id, getattr(course, "name", None), started),
+        )
+        self.db.commit()
+
+        return (assignments_changed, len(submissions_changed))
+
+    def _assignment(self, requester, row: sqlite3.Row):
+        return AssignmentRecord(
+            requester,
+            {
+                "id": row["id"],
+                "course_id": int(row["course_id"]),
+                "position": row["position"],
+                "name": row["name"],
+                "due_at": row["due_at"],
+                "lock_at": row["lock_at"],
+                "locked_for_user": bool(row["locked_for_user"]),
+                "lock_explanation": row["lock_explanation"],
+                "grading_type": row["grading_type"],
+                "submission_types": json.loads(row["submission_types"] or "[]"),
+                "quiz_id": row["quiz_id"],
+                "points_possible": row["points_possible"],
+                "updated_at": row["updated_at"],
+                "submission": {
+                    "workflow_state": row["workflow_state"] or "unsubmitted",
+                    "submitted_at": row["submitted_at"],
+                    "graded_at": row["graded_at"],
+                    "grade": row["grade"],
+                    "score": row["score"],
+                },
+            },
+        )
+
+    def assignments(self, requester, course_id, order_by: str = "position"):
+        """Returns the assignments of a synced course, with their submissions."""
+        rows = self.db.execute(
+            f"SELECT {ASSIGNMENT_COLUMNS} FROM assignments a "
+            "LEFT JOIN submissions s ON s.assignment_id = a.id "
+            f"WHERE a.course_id = ? ORDER BY {ORDER_BY[order_by]}",
+            (str(course_id),),
+        )
+
+        return [self._assignment(requester, row) for row in rows]
+
+    def due_within(
+        self, requester, hours: float = None, course_ids: list = None, unsubmitted=True
+    ):
+        """Returns assignments with a due date, soonest first.
+
+        With `hours`, only assignments due between now and that many hours
+        from now are returned, and with `unsubmitted` only the ones that have
+        not been submitted.
+        """
+        clauses = ["a.due_at IS NOT NULL"]
+        params: list = []
+        if hours is not None:
+            until = datetime.now(timezone.utc) + timedelta(hours=hours)
+            clauses.append("a.due_at BETWEEN ? AND ?")
+            params += [_now(), until.strftime("%Y-%m-%dT%H:%M:%SZ")]
+        if course_ids is not None:
+            clauses.append(f"a.course_id IN ({','.join('?' * len(course_ids))})")
+            params += [str(course_id) for course_id in course_ids]
+        if unsubmitted:
+            clauses.append(
+                "COALESCE(s.workflow_state, 'unsubmitted') = 'unsubmitted' "
+                "AND NOT a.locked_for_user"
+            )
+
+        rows = self.db.execute(
+            f"SELECT {ASSIGNMENT_COLUMNS} FROM assignments a "
+            "LEFT JOIN submissions s ON s.assignment_id = a.id "
+            f"WHERE {' AND '.join(clauses)} ORDER BY a.due_at",
+            params,
+        )
+
+        return [self._assignment(requester, row) for row in rows]
+
+    def quiz_points(self, course_id):
+        return {
+            row["id"]: row["points_possible"]
+            for row in self.db.execute(
+                "SELECT id, points_possible FROM quizzes WHERE course_id = ?",
+                (str(course_id),),
+            )
+        }
@@ -0,0 +1,99 @@
+import os
+import uuid
+from typing import Callable
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_size(file):
+    """Returns the size of an open file, or the length of a file-like stream."""
+    if hasattr(file, "__len__"):
+        return len(file)
+
+    return os.fstat(file.fileno()).st_size
+
+
+def _quote(value: str):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+class MultipartEncoder:
+    """A `multipart/form-data` body that streams its file part in chunks.
+
+    The encoder has a known length, so it is sent with a `Content-Length`
+    header, and iterating over it never holds more than one chunk of the file
+    in memory. Iterating again starts over from the beginning of the file,
+    which allows a failed upload to be retried with the same encoder.
+    """
+
+    def __init__(
+        self,
+        fields: list[tuple],
+        file,
+        filename: str = None,
+        chunk_size: int = CHUNK_SIZE,
+        on_progress: Callable[[int, int], None] = None,
+    ):
+        """
+        :param fields: The form fields to send before the file, as 2-tuples.
+        :type fields: list
+        :param file: A binary file handler pointing to the file to upload.
+        :param filename: The filename to report for the file part.
+        :type filename: str
+        :param chunk_size: How many bytes of the file to read at a time.
+        :type chunk_size: int
+        :param on_progress: Called with the bytes sent so far and the total \
+            length of the body after every chunk.
+        :type on_progress: callable
+        """
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.file = file
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+
+        filename = filename or os.path.basename(getattr(file, "name", "file"))
+
+        preamble = b""
+        for name, value in fields:
+            preamble += (
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{_quote(str(name))}"\r\n\r\n'
+            ).encode() + f"{value}\r\n".encode()
+
+        preamble += (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{_quote(filename)}"\r\n\r\n'
+        ).encode()
+
+        self._preamble = preamble
+        self._epilogue = f"\r\n--{self.boundary}--\r\n".encode()
+        self._start = file.tell()
+        self.file_size = file_size(file) - self._start
+
+    def __len__(self):
+        return len(self._preamble) + self.file_size + len(self._epilogue)
+
+    def __iter__(self):
+        total = len(self)
+        sent = 0
+
+        def progress(chunk: bytes):
+            nonlocal sent
+            sent += len(chunk)
+            if self.on_progress:
+                self.on_progress(sent, total)
+            return chunk
+
+        yield progress(self._preamble)
+
+        self.file.seek(self._start)
+        left = self.file_size
+        while left > 0:
+            chunk = self.file.read(min(self.chunk_size, left))
+            if not chunk:
+                raise IOError("File changed size while it was being uploaded.")
+            left -= len(chunk)
+            yield progress(chunk)
+
+        yield progress(self._epilogue)
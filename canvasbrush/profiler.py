@@ -0,0 +1,249 @@
+import re
+import json
+import time
+import threading
+from urllib.parse import urlparse
+import requests
+
+# what each kind of request is for, by method and regular expression over the
+# endpoint. requests that leave the API, like the upload to the storage
+# service, are told apart by their host instead.
+PHASES = [
+    ("POST", r"/submissions/self/files$", "upload token"),
+    ("GET", r"^files/[^/]+/create_success$", "upload confirm"),
+    ("POST", r"^courses/[^/]+/assignments/[^/]+/submissions$", "submit"),
+    ("GET", r"^courses/[^/]+$", "course"),
+    ("GET", r"/assignments(/[^/]+)?$", "assignments"),
+    ("GET", r"/submissions$", "submissions"),
+    ("GET", r"/quizzes(/[^/]+)?$", "quizzes"),
+]
+
+
+class RequestRecord:
+    """One request, with its timings in seconds since profiling started."""
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        phase: str,
+        status: int,
+        sent: int,
+        received: int,
+        started: float,
+        duration: float,
+        thread: int,
+        cached: bool = False,
+    ):
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        self.phase = phase
+        self.status = status
+        self.sent = sent
+        self.received = received
+        self.started = started
+        self.duration = duration
+        self.thread = thread
+        self.cached = cached
+
+
+class Profiler:
+    """Records every HTTP request a :class:`canvasbrush.Brush` makes.
+
+    Attached to a requester, it hooks the session every request goes
+    through, including the uploads the :class:`canvasbrush.uploader.Uploader`
+    streams to the storage service, and records each one's endpoint, phase,
+    status, bytes and latency. Responses answered from the HTTP cache are
+    recorded as cached.
+    """
+
+    def __init__(self):
+        self.records: list[RequestRecord] = []
+        self.base_url = ""
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._threads: dict[int, str] = {}
+
+    def attach(self, requester):
+        """Starts recording the requests made through `requester`."""
+        self.base_url = requester.base_url
+        requester.profiler = self
+        requester._session.hooks["response"].append(self._on_response)
+
+    def detach(self, requester):
+        """Stops recording the requests made through `requester`."""
+        requester.profiler = None
+        requester._session.hooks["response"].remove(self._on_response)
+
+    def endpoint(self, url: str):
+        """Returns the endpoint of a URL with its IDs replaced by `:id`."""
+        path = url.split("?")[0]
+        if not path.startswith(self.base_url):
+            return urlparse(url).netloc
+
+        return "/".join(
+            ":id" if segment.isdigit() or segment.startswith("sis_") else segment
+            for segment in path.removeprefix(self.base_url).split("/")
+        )
+
+    def phase(self, method: str, url: str):
+        """Names what a request was made for."""
+        if not url.startswith(self.base_url):
+            return "storage" if method == "POST" else "external"
+
+        endpoint = url.removeprefix(self.base_url).split("?")[0]
+        for phase_method, pattern, name in PHASES:
+            if method == phase_method and re.search(pattern, endpoint):
+                return name
+
+        return "other"
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        sent: int,
+        received: int,
+        started: float,
+        ended: float,
+        cached: bool = False,
+    ):
+        ident = threading.get_ident()
+
+        with self._lock:
+            self._threads.setdefault(ident, threading.current_thread().name)
+            self.records.append(
+                RequestRecord(
+                    method=method,
+                    url=url,
+                    endpoint=self.endpoint(url),
+                    phase=self.phase(method, url),
+                    status=status,
+                    sent=sent,
+                    received=received,
+                    started=started - self._started,
+                    duration=ended - started,
+                    thread=ident,
+                    cached=cached,
+                )
+            )
+
+    def _on_response(self, response: requests.Response, *args, **kwargs):
+        now = time.perf_counter()
+        started = now - response.elapsed.total_seconds()
+
+        request = response.request
+        length = request.headers.get("Content-Length")
+        sent = 0
+        if length is not None:
+            sent = int(length)
+        elif isinstance(request.body, (bytes, str)):
+            sent = len(request.body)
+
+        # the body is read here rather than after the hook so that its
+        # transfer counts towards the request's latency
+        received = len(response.content or b"")
+
+        # a prepared request always has both, whatever its annotations allow
+        self.record(
+            request.method or "",
+            request.url or "",
+            response.status_code,
+            sent,
+            received,
+            started,
+            time.perf_counter(),
+        )
+
+    def summary(self):
+        """Groups the records by phase and endpoint, slowest in total first.
+
+        Each row is a dict with the phase, method and endpoint, how many
+        requests were made and how many of them were cached, repeated (the
+        same URL asked for again) or failed, their total and slowest time in
+        seconds, and the bytes sent and received.
+        """
+        rows: dict[tuple, dict] = {}
+        for record in self.records:
+            row = rows.setdefault(
+                (record.phase, record.method, record.endpoint),
+                {
+                    "phase": record.phase,
+                    "method": record.method,
+                    "endpoint": record.endpoint,
+                    "requests": 0,
+                    "cached": 0,
+                    "repeated": 0,
+                    "errors": 0,
+                    "time": 0.0,
+                    "slowest": 0.0,
+                    "sent": 0,
+                    "received": 0,
+                    "_urls": set(),
+                },
+            )
+            row["requests"] += 1
+            row["cached"] += record.cached
+            row["repeated"] += record.url in row["_urls"]
+            row["errors"] += record.status >= 400
+            row["time"] += record.duration
+            row["slowest"] = max(row["slowest"], record.duration)
+            row["sent"] += record.sent
+            row["received"] += record.received
+            row["_urls"].add(record.url)
+
+        for row in rows.values():
+            del row["_urls"]
+
+        return sorted(rows.values(), key=lambda row: -row["time"])
+
+    def wall_time(self):
+        """Seconds from the first request starting to the last one ending."""
+        if not self.records:
+            return 0.0
+
+        return max(r.started + r.duration for r in self.records) - min(
+            r.started for r in self.records
+        )
+
+    def trace(self):
+        """Returns the records in the Chrome trace event format."""
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": thread,
+                "args": {"name": name},
+            }
+            for thread, name in self._threads.items()
+        ]
+        for record in self.records:
+            events.append(
+                {
+                    "name": f"{record.method} {record.endpoint}",
+                    "cat": record.phase,
+                    "ph": "X",
+                    "ts": round(record.started * 1_000_000),
+                    "dur": round(record.duration * 1_000_000),
+                    "pid": 1,
+                    "tid": record.thread,
+                    "args": {
+                        "url": record.url,
+                        "status": record.status,
+                        "sent": record.sent,
+                        "received": record.received,
+                        "cached": record.cached,
+                    },
+                }
+            )
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str):
+        """Writes the records to `path` for chrome://tracing or Perfetto."""
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
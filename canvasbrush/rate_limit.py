@@ -0,0 +1,147 @@
+import time
+import threading
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+# Canvas keeps a leaky bucket of request cost per token. Every request is
+# charged a flat penalty while it is in flight, on top of what it ends up
+# costing, and the bucket drains back at a steady rate.
+BUCKET_SIZE = 700.0
+PENALTY = 50.0
+REFILL_RATE = 10.0
+
+
+def is_rate_limited(response: requests.Response):
+    return response.status_code == 403 and b"Rate Limit Exceeded" in response.content
+
+
+class RateLimiter:
+    """Schedules requests against Canvas' rate limit bucket.
+
+    The bucket is tracked from the `X-Rate-Limit-Remaining` and
+    `X-Request-Cost` headers of every response. While there is more headroom
+    than `headroom`, up to `max_in_flight` requests run at once. Below it,
+    the number of concurrent requests shrinks in proportion, down to one at
+    a time, and once a request would overdraw the bucket it waits for it to
+    refill. Shared by every thread making requests with the same token.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        headroom: float = 300.0,
+        refill_rate: float = REFILL_RATE,
+    ):
+        """
+        :param max_in_flight: How many requests may run at once while there \
+            is plenty of headroom.
+        :type max_in_flight: int
+        :param headroom: How much of the bucket has to be left for requests \
+            to run at full speed.
+        :type headroom: float
+        :param refill_rate: How much of the bucket is assumed to come back \
+            every second.
+        :type refill_rate: float
+        """
+        self.max_in_flight = max_in_flight
+        self.headroom = headroom
+        self.refill_rate = refill_rate
+        self.remaining: Optional[float] = None
+        self.cost = 0.0
+        self.in_flight = 0
+        self._updated_at = 0.0
+        self._condition = threading.Condition()
+
+    def available(self, now: float):
+        """Estimates what is left in the bucket once in-flight requests are paid."""
+        if self.remaining is None:
+            estimate = BUCKET_SIZE
+        else:
+            refilled = (now - self._updated_at) * self.refill_rate
+            estimate = min(BUCKET_SIZE, self.remaining + refilled)
+
+        return estimate - self.in_flight * (PENALTY + self.cost)
+
+    def _wait_time(self, now: float):
+        """Returns how long to wait before a request may start, if at all."""
+        available = self.available(now)
+        needed = PENALTY + self.cost
+
+        if available >= self.headroom:
+            limit = self.max_in_flight
+        else:
+            limit = max(1, int(self.max_in_flight * available / self.headroom))
+
+        if self.in_flight >= limit:
+            # a request finishing will wake the waiter up before this
+            return 1.0
+        if available < needed:
+            return (needed - available) / self.refill_rate
+
+        return 0.0
+
+    def acquire(self):
+        """Blocks until a request can be made without draining the bucket."""
+        with self._condition:
+            while (delay := self._wait_time(time.monotonic())) > 0:
+                self._condition.wait(delay)
+            self.in_flight += 1
+
+    def release(self, response: requests.Response = None):
+        """Records a finished request and what Canvas said about the bucket."""
+        with self._condition:
+            self.in_flight -= 1
+            if response is not None:
+                self.update(response)
+            self._condition.notify_all()
+
+    def update(self, response: requests.Response):
+        remaining = response.headers.get("X-Rate-Limit-Remaining")
+        cost = response.headers.get("X-Request-Cost")
+
+        if cost is not None:
+            # smoothed, since one expensive request says little about the next
+            self.cost = 0.8 * self.cost + 0.2 * float(cost)
+        if remaining is not None:
+            self.remaining = float(remaining)
+            self._updated_at = time.monotonic()
+        elif is_rate_limited(response):
+            self.remaining = 0.0
+            self._updated_at = time.monotonic()
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """An adapter that makes every request wait its turn with a RateLimiter.
+
+    Requests that Canvas still throttles are sent again once the bucket has
+    had time to refill, as long as their body can be sent twice, so callers
+    see the delay rather than the error.
+    """
+
+    def __init__(self, limiter: RateLimiter, attempts: int = 5, **kwargs):
+        self.limiter = limiter
+        self.attempts = attempts
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, *args, **kwargs):
+        resendable = isinstance(request.body, (bytes, str, type(None)))
+
+        for attempt in range(self.attempts):
+            self.limiter.acquire()
+            response = None
+            try:
+                response = super().send(request, *args, **kwargs)
+            finally:
+                self.limiter.release(response)
+
+            if (
+                not resendable
+                or attempt == self.attempts - 1
+                or not is_rate_limited(response)
+            ):
+                return response
+
+            response.close()
+
+        return response
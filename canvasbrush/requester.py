@@ -0,0 +1,101 @@
+import time
+import hashlib
+from urllib.parse import urlencode, urlparse
+from canvasapi.requester import Requester
+from canvasbrush.http_cache import HttpCache
+from canvasbrush.rate_limit import RateLimitedAdapter, RateLimiter
+
+
+class BrushRequester(Requester):
+    """
+    A :class:`canvasapi.requester.Requester` that answers GET requests from an
+    :class:`canvasbrush.http_cache.HttpCache` where it can.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        access_token,
+        cache: HttpCache = None,
+        rate_limiter: RateLimiter = None,
+    ):
+        """
+        :param base_url: The base URL of the Canvas instance's API.
+        :type base_url: str
+        :param access_token: The API key to authenticate requests with.
+        :type access_token: str
+        :param cache: Where to cache responses, if anywhere.
+        :type cache: :class:`canvasbrush.http_cache.HttpCache`
+        :param rate_limiter: What schedules requests to the Canvas instance, \
+            if anything.
+        :type rate_limiter: :class:`canvasbrush.rate_limit.RateLimiter`
+        """
+        super().__init__(base_url, access_token)
+        self.cache = cache
+        self.profiler = None
+
+        # only requests to Canvas itself count against its rate limit, not
+        # the ones to the storage service files are uploaded to
+        self.rate_limiter = rate_limiter
+        if rate_limiter:
+            url = urlparse(self.base_url)
+            self._session.mount(
+                f"{url.scheme}://{url.netloc}/", RateLimitedAdapter(rate_limiter)
+            )
+
+        self._user = hashlib.sha256(access_token.encode()).hexdigest()[:16]
+
+    def request(self, method, endpoint=None, *args, **kwargs):
+        response = super().request(method, endpoint, *args, **kwargs)
+
+        # anything that is not a GET may have changed what Canvas would answer
+        if method != "GET" and self.cache and kwargs.get("use_auth", True):
+            self.cache.expire()
+
+        return response
+
+    def _get_request(self, url, headers, params=None, **kwargs):
+        if not self.cache:
+            return super()._get_request(url, headers, params, **kwargs)
+
+        endpoint = url.removeprefix(self.base_url).split("?")[0]
+        key = self.cache.key(url, params, self._user)
+        entry = self.cache.get(key)
+
+        if entry and self.cache.is_fresh(entry):
+            started = time.perf_counter()
+            response = self.cache.response(key, entry)
+            if response is not None:
+                if self.profiler:
+                    self.profiler.record(
+                        "GET",
+                        f"{url}?{urlencode(params)}" if params else url,
+                        response.status_code,
+                        0,
+                        len(response.content),
+                        started,
+                        time.perf_counter(),
+                        cached=True,
+                    )
+                return response
+
+        if entry:
+            headers = {**headers, **self.cache.validators(entry)}
+
+        response = super()._get_request(url, headers, params, **kwargs)
+
+        if response.status_code == 304 and entry:
+            cached = self.cache.response(key, entry)
+            if cached is not None:
+                self.cache.refresh(key)
+                return cached
+
+            # the body went missing, so ask again without validators
+            headers.pop("If-None-Match", None)
+            headers.pop("If-Modified-Since", None)
+            response = super()._get_request(url, headers, params, **kwargs)
+
+        if response.status_code == 200:
+            self.cache.put(key, endpoint, response)
+
+        return response
@@ -0,0 +1,48 @@
+import threading
+from canvasbrush.util import load_json_entries, write_json_atomic
+
+
+class UploadCache:
+    """A local content-addressed store of files already uploaded to Canvas.
+
+    Entries are keyed by the SHA-256 digest and size of the file, and map an
+    upload scope (the upload endpoint and the user it was made as) to the ID
+    of the file Canvas created for it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        self._entries: dict[str, dict[str, int]] = load_json_entries(path)
+
+    @staticmethod
+    def _key(digest: str, size: int):
+        return f"{digest}:{size}"
+
+    def get(self, digest: str, size: int, scope: str):
+        """Returns the ID of a previous upload of the same bytes, if any."""
+        with self._lock:
+            return self._entries.get(self._key(digest, size), {}).get(scope)
+
+    def put(self, digest: str, size: int, scope: str, file_id: int):
+        """Records an upload and saves the store."""
+        with self._lock:
+            self._entries.setdefault(self._key(digest, size), {})[scope] = file_id
+            self._save()
+
+    def forget(self, scope: str, file_ids: list[int]):
+        """Drops the entries of a scope that point to any of `file_ids`."""
+        with self._lock:
+            changed = False
+            for scopes in self._entries.values():
+                if scopes.get(scope) in file_ids:
+                    del scopes[scope]
+                    changed = True
+
+            if changed:
+                self._entries = {k: v for k, v in self._entries.items() if v}
+                self._save()
+
+    def _save(self):
+        write_json_atomic(self.path, {"entries": self._entries})
@@ -0,0 +1,54 @@
+import time
+import threading
+from canvasbrush.util import load_json_entries, write_json_atomic
+
+TOKEN = "token"
+UPLOADED = "uploaded"
+
+# how long an upload token is trusted to still be valid when resuming
+TOKEN_MAX_AGE = 30 * 60
+
+
+class UploadJournal:
+    """An on-disk record of the upload phases completed for each file.
+
+    A file's entry holds the token returned by the first phase, or the
+    confirmation URL returned by the second, and is removed once the upload
+    has been confirmed. Re-running an interrupted upload picks up from the
+    last phase recorded here.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        self._entries: dict[str, dict] = load_json_entries(path)
+
+    def get(self, key: str):
+        """Returns the last phase recorded for a file, if it can be resumed."""
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if (
+            entry
+            and entry["phase"] == TOKEN
+            and time.time() - entry["at"] > TOKEN_MAX_AGE
+        ):
+            return None
+
+        return entry
+
+    def record(self, key: str, phase: str, **data):
+        """Records that a file has completed `phase`."""
+        with self._lock:
+            self._entries[key] = {"phase": phase, "at": time.time(), **data}
+            self._save()
+
+    def complete(self, key: str):
+        """Removes a file whose upload has been confirmed."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def _save(self):
+        write_json_atomic(self.path, {"entries": self._entries})
@@ -1,9 +1,13 @@
 import os
 import json
-import validators
 import canvasapi.upload
 
+from typing import Callable
+from canvasapi.exceptions import CanvasException
 from canvasapi.util import combine_kwargs
+from canvasbrush.multipart import MultipartEncoder, file_size
+from canvasbrush.upload_journal import TOKEN, UPLOADED, UploadJournal
+from canvasbrush.util import retry
 
 
 class Uploader(canvasapi.upload.Uploader):
@@ -16,6 +20,9 @@ class Uploader(canvasapi.upload.Uploader):
         requester,
         url,
         file_or_url: canvasapi.upload.FileOrPathLike | str,
+        on_progress: Callable[[int, int], None] = None,
+        journal: UploadJournal = None,
+        journal_key: str = None,
         **kwargs,
     ):
         """
@@ -23,10 +30,22 @@ class Uploader(canvasapi.upload.Uploader):
         :type requester: :class:`canvasapi.requester.Requester`
         :param url: The URL to upload the file to.
         :type url: str
-        :param file: A file handler or path of the file to upload.
-        :type file: :class:`os.PathLike` or str
+        :param file: A file handler or path of the file to upload, or a URL.
+        :type file: :class:`os.PathLike`, str or a file-like object
+        :param on_progress: Called with the bytes sent so far and the total \
+            size of the request body while the file is being uploaded.
+        :type on_progress: callable
+        :param journal: Where to record completed phases so that an \
+            interrupted upload can be resumed.
+        :type journal: :class:`canvasbrush.upload_journal.UploadJournal`
+        :param journal_key: What identifies this upload in the journal.
+        :type journal_key: str
         """
-        if validators.url(file_or_url):
+        # validators compiles its URL pattern on import, which is slow enough to
+        # notice on every run of the CLI
+        import validators
+
+        if isinstance(file_or_url, str) and validators.url(file_or_url):
             self._using_url = True
             self._using_filename = False
         elif isinstance(file_or_url, (os.PathLike, str)):
@@ -41,26 +60,44 @@ class Uploader(canvasapi.upload.Uploader):
         self._requester = requester
         self.url = url
         self.file = file_or_url
+        self.on_progress = on_progress
+        self.journal = journal if journal_key else None
+        self.journal_key = journal_key
         self.kwargs = kwargs
 
     def request_upload_token(self, file):
         """
-        Request an upload token.
+        Request an upload token, or reuse the one recorded in the journal.
 
         :param file: A file handler pointing to the file to upload.
         :returns: True if the file uploaded successfully, False otherwise, \
             and the JSON response from the API.
         :rtype: tuple
         """
+        entry = self.journal.get(self.journal_key) if self.journal else None
+        if entry:
+            try:
+                if entry["phase"] == UPLOADED:
+                    return self.confirm(entry["location"])
+                return self.upload(entry["token"], file)
+            except Exception:
+                # the recorded phase could not be resumed, so start over
+                self.journal.complete(self.journal_key)
+
         if not self._using_url:
             self.kwargs["name"] = os.path.basename(file.name)
-            self.kwargs["size"] = os.fstat(file.fileno()).st_size
+            self.kwargs["size"] = file_size(file)
         else:
             self.kwargs["url"] = file
 
-        response = self._requester.request(
-            "POST", self.url, _kwargs=combine_kwargs(**self.kwargs)
-        )
+        response = retry(
+            lambda: self._requester.request(
+                "POST", self.url, _kwargs=combine_kwargs(**self.kwargs)
+            )
+        ).json()
+
+        if self.journal:
+            self.journal.record(self.journal_key, TOKEN, token=response)
 
         return self.upload(response, file)
 
@@ -69,13 +106,13 @@ class Uploader(canvasapi.upload.Uploader):
         Upload the file.
 
         :param response: The response from the upload request.
-        :type response: dict
+        :type response: :class:`requests.Response` or dict
         :param file: A file handler pointing to the file to upload.
         :returns: True if the file uploaded successfully, False otherwise, \
             and the JSON response from the API.
         :rtype: tuple
         """
-        response = response.json()
+        response = response if isinstance(response, dict) else response.json()
         if not response.get("upload_url"):
             raise ValueError("Bad API response. No upload_url.")
 
@@ -85,23 +122,87 @@ class Uploader(canvasapi.upload.Uploader):
         kwargs = response.get("upload_params")
 
         response = (
-            self._requester.request(
-                "POST",
-                use_auth=False,
-                _url=response.get("upload_url"),
-                file=file,
-                _kwargs=combine_kwargs(**kwargs),
-            )
+            retry(lambda: self.post_stream(response.get("upload_url"), kwargs, file))
             if not self._using_url
-            else self._requester.request(
-                "POST",
-                use_auth=False,
-                _url=response.get("upload_url"),
-                _kwargs=combine_kwargs(**kwargs),
+            else retry(
+                lambda: self._requester.request(
+                    "POST",
+                    use_auth=False,
+                    _url=response.get("upload_url"),
+                    _kwargs=combine_kwargs(**kwargs),
+                )
             )
         )
 
+        if response.is_redirect:
+            location = response.headers["Location"]
+            if self.journal:
+                self.journal.record(self.journal_key, UPLOADED, location=location)
+
+            return self.confirm(location)
+
+        return self._finish(response)
+
+    def confirm(self, location):
+        """
+        Confirm an upload that the storage service answered with a redirect.
+
+        :param location: The URL the storage service redirected to.
+        :type location: str
+        :returns: True if the file uploaded successfully, False otherwise, \
+            and the JSON response from the API.
+        :rtype: tuple
+        """
+        response = retry(lambda: self._requester.request("GET", _url=location))
+
+        return self._finish(response)
+
+    def _finish(self, response):
         # remove `while(1);` that may appear at the top of a response
         response_json = json.loads(response.text.lstrip("while(1);"))
 
+        if self.journal:
+            self.journal.complete(self.journal_key)
+
         return ("url" in response_json, response_json)
+
+    def post_stream(self, url, params, file):
+        """
+        Stream the file to the storage URL as a multipart form.
+
+        The file is read in fixed-size chunks while the request is being sent,
+        so memory use does not grow with the size of the file. Redirects are
+        not followed, since confirming them needs an authenticated request.
+
+        :param url: The storage URL returned by the upload token request.
+        :type url: str
+        :param params: The upload parameters returned alongside the URL.
+        :type params: dict
+        :param file: A file handler pointing to the file to upload.
+        :rtype: :class:`requests.Response`
+        """
+        encoder = MultipartEncoder(
+            combine_kwargs(**params), file, on_progress=self.on_progress
+        )
+
+        response = self._requester._session.post(
+            url,
+            data=encoder,
+            headers={"Content-Type": encoder.content_type},
+            allow_redirects=False,
+        )
+
+        if response.status_code >= 400:
+            raise UploadError(response.status_code)
+
+        return response
+
+
+class UploadError(CanvasException):
+    """The storage service rejected an upload."""
+
+    def __init__(self, status_code: int):
+        super().__init__(
+            "Encountered an error while uploading: status code {}".format(status_code)
+        )
+        self.status_code = status_code
@@ -1,11 +1,27 @@
+import os
 import re
+import json
+import time
+import random
+import hashlib
+import requests
+import urllib3
+from typing import Callable
 from canvasapi.assignment import Assignment
+from canvasapi.exceptions import CanvasException, RateLimitExceeded
+from canvasbrush.zipstream import ZipStream
 
 
 class AssignmentPlusFile:
-    def __init__(self, assignment: Assignment, file_path: str):
+    def __init__(
+        self,
+        assignment: Assignment,
+        file_path: str | ZipStream,
+        comment: str = None,
+    ):
         self.assignment = assignment
         self.file_path = file_path
+        self.comment = comment
 
 
 class ProgressBar:
@@ -84,3 +100,110 @@ def number_from_end(s: str):
         return int(next(re.finditer(r"\d+$", s)).group(0))
     except Exception:
         raise ValueError("no numbers from end of string")
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "brush")
+
+
+def load_json_entries(path: str):
+    """Returns the `entries` of a JSON store, or an empty dict if it cannot be read."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)["entries"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def write_json_atomic(path: str, data):
+    """Writes JSON to `path` in one step, so a reader never sees half of it."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def sha256_file(path: str, chunk_size: int = 1024 * 1024):
+    """Hashes a file in a single streaming pass, returning its digest and size."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+
+    return (digest.hexdigest(), size)
+
+
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# statuses Canvas answers with before acting on a request
+NOT_PROCESSED_STATUS_CODES = {429, 503}
+
+
+def status_code(error: Exception):
+    """Returns the HTTP status of a Canvas error, if it has one."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        # canvasapi only reports the status code in the message
+        match = re.search(r"status code (\d+)", str(error))
+        status = int(match.group(1)) if match else None
+    return status
+
+
+def is_transient(error: Exception):
+    """Whether an error is likely to go away if the request is made again."""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, RateLimitExceeded):
+        return True
+    if isinstance(error, CanvasException):
+        return status_code(error) in TRANSIENT_STATUS_CODES
+    return False
+
+
+def was_not_processed(error: Exception):
+    """Whether an error shows the request never reached Canvas' handling of it.
+
+    Only these are safe to retry for a request that must not happen twice:
+    a read timeout or a dropped connection may come after Canvas already
+    acted on the request.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and not isinstance(
+        error, requests.Timeout
+    ):
+        # the connection could not be opened at all
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, urllib3.exceptions.NewConnectionError)
+    if isinstance(error, RateLimitExceeded):
+        return True
+    if isinstance(error, CanvasException):
+        return status_code(error) in NOT_PROCESSED_STATUS_CODES
+    return False
+
+
+def retry(
+    function: Callable,
+    attempts: int = 5,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0,
+    transient: Callable = is_transient,
+):
+    """Calls `function` until it succeeds, retrying the errors `transient` accepts.
+
+    Waits between attempts grow exponentially from `base_delay` up to
+    `max_delay`, with full jitter so that concurrent workers do not retry in
+    lockstep.
+    """
+    for attempt in range(attempts):
+        try:
+            return function()
+        except Exception as e:
+            if attempt == attempts - 1 or not transient(e):
+                raise
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2**attempt)))
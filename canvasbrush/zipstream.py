@@ -0,0 +1,240 @@
+import os
+import zlib
+import struct
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 1024 * 1024
+
+# files up to this size are compressed whole by the worker pool, larger ones
+# are compressed in chunks while the archive is being read
+PARALLEL_LIMIT = 4 * 1024 * 1024
+
+# every entry gets the same timestamp and permissions so that the archive of
+# an unchanged directory is byte-for-byte identical between runs
+DOS_TIME = 0
+DOS_DATE = (0 << 9) | (1 << 5) | 1
+EXTERNAL_ATTR = 0o100644 << 16
+
+VERSION = 20
+VERSION_MADE_BY = (3 << 8) | VERSION
+FLAGS = 0x08 | 0x800
+DEFLATED = 8
+
+
+def _compress_file(path: str, level: int):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return (zlib.crc32(data), len(data), compressor.compress(data) + compressor.flush())
+
+
+class ZipStream:
+    """A zip archive of a directory, produced on the fly as it is read.
+
+    Entries are ordered by path and carry fixed timestamps, so the archive,
+    and therefore its content hash, is stable across runs. Files are
+    compressed in parallel by a pool of workers, a bounded number of entries
+    ahead of the reader, and no part of the archive is written to disk.
+
+    The object behaves like a read-only binary file that can only be rewound
+    to its start, which is what :class:`canvasbrush.uploader.Uploader` needs
+    to stream it as a request body.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        level: int = 6,
+        workers: int = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        """
+        :param directory: The directory to archive, including subdirectories.
+        :type directory: str
+        :param level: The zlib compression level.
+        :type level: int
+        :param workers: How many files to compress at once. Defaults to the \
+            number of CPUs.
+        :type workers: int
+        """
+        directory = os.path.normpath(directory)
+        if not os.path.isdir(directory):
+            raise IOError("Directory {} does not exist.".format(directory))
+
+        self.directory = directory
+        self.name = f"{os.path.basename(os.path.abspath(directory))}.zip"
+        self.level = level
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+        root = os.path.basename(os.path.abspath(directory))
+        self.entries: list[tuple[str, str]] = []
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if os.path.isfile(path):
+                    relative = os.path.relpath(path, directory).replace(os.sep, "/")
+                    self.entries.append((f"{root}/{relative}", path))
+        self.entries.sort()
+
+        if len(self.entries) > 0xFFFF:
+            raise ValueError("too many files to zip without ZIP64 support")
+
+        self._digest = None
+        self._size = None
+        self.seek(0)
+
+    def measure(self):
+        """Builds the archive once, returning its SHA-256 digest and size."""
+        if self._digest is None:
+            digest = hashlib.sha256()
+            size = 0
+            for chunk in self._chunks():
+                digest.update(chunk)
+                size += len(chunk)
+            self._digest, self._size = digest.hexdigest(), size
+
+        return (self._digest, self._size)
+
+    def __len__(self):
+        return self.measure()[1]
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET):
+        if whence == os.SEEK_SET and offset == 0:
+            self._iterator = self._chunks()
+            self._buffer = bytearray()
+            self._position = 0
+        elif not (whence == os.SEEK_CUR and offset == 0):
+            raise OSError("ZipStream can only be rewound to its start")
+
+        return self._position
+
+    def read(self, size: int = -1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._iterator, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        size = len(self._buffer) if size < 0 else size
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self._position += len(data)
+
+        return data
+
+    def _chunks(self):
+        offset = 0
+        central = []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            entries = iter(self.entries)
+            queued = deque()
+
+            def fill():
+                while len(queued) < self.workers * 2:
+                    entry = next(entries, None)
+                    if entry is None:
+                        return
+                    future = (
+                        executor.submit(_compress_file, entry[1], self.level)
+                        if os.path.getsize(entry[1]) <= PARALLEL_LIMIT
+                        else None
+                    )
+                    queued.append((entry, future))
+
+            fill()
+            while queued:
+                (arcname, path), future = queued.popleft()
+                fill()
+
+                name = arcname.encode("utf-8")
+                header = struct.pack(
+                    "<IHHHHHIIIHH",
+                    0x04034B50,
+                    VERSION,
+                    FLAGS,
+                    DEFLATED,
+                    DOS_TIME,
+                    DOS_DATE,
+                    0,
+                    0,
+                    0,
+                    len(name),
+                    0,
+                )
+                yield header + name
+
+                if future:
+                    crc, size, data = future.result()
+                    compressed = len(data)
+                    yield data
+                else:
+                    crc, size, compressed = 0, 0, 0
+                    compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+                    with open(path, "rb") as f:
+                        while chunk := f.read(self.chunk_size):
+                            crc = zlib.crc32(chunk, crc)
+                            size += len(chunk)
+                            data = compressor.compress(chunk)
+                            compressed += len(data)
+                            if data:
+                                yield data
+                    data = compressor.flush()
+                    compressed += len(data)
+                    yield data
+
+                if size > 0xFFFFFFFF or compressed > 0xFFFFFFFF:
+                    raise ValueError(
+                        f"{path} is too large to zip without ZIP64 support"
+                    )
+
+                yield struct.pack("<IIII", 0x08074B50, crc, compressed, size)
+
+                central.append(
+                    struct.pack(
+                        "<IHHHHHHIIIHHHHHII",
+                        0x02014B50,
+                        VERSION_MADE_BY,
+                        VERSION,
+                        FLAGS,
+                        DEFLATED,
+                        DOS_TIME,
+                        DOS_DATE,
+                        crc,
+                        compressed,
+                        size,
+                        len(name),
+                        0,
+                        0,
+                        0,
+                        0,
+                        EXTERNAL_ATTR,
+                        offset,
+                    )
+                    + name
+                )
+                offset += len(header) + len(name) + compressed + 16
+
+        if offset > 0xFFFFFFFF:
+            raise ValueError("archive is too large to zip without ZIP64 support")
+
+        directory = b"".join(central)
+        yield directory + struct.pack(
+            "<IHHHHIIH",
+            0x06054B50,
+            0,
+            0,
+            len(central),
+            len(central),
+            len(directory),
+            offset,
+            0,
+        )
@@ -1,5 +1,13 @@
-from cli.brush_cli import BrushCli
-
 __all__ = ["BrushCli"]
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str):
+    # BrushCli pulls in canvasapi and rich, which `cli.client` must not wait for
+    if name == "BrushCli":
+        from cli.brush_cli import BrushCli
+
+        return BrushCli
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
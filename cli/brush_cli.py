@@ -1,27 +1,63 @@
+from __future__ import annotations
+
 import argparse
 import re
-import validators
 import os
 import sys
-from datetime import datetime
-from canvasbrush import Brush
-from canvasbrush.util import AssignmentPlusFile, ProgressBar, is_integer, to_num
-import argparse
-from canvasapi.assignment import Assignment
-from canvasapi.course import Course
-from pathlib import Path
-from rich.console import Console
+import json
+from typing import TYPE_CHECKING, Iterable
+
+# everything heavier than the standard library is imported by the commands
+# that use it, so that `--help` and argument errors return straight away
+if TYPE_CHECKING:
+    from canvasapi.assignment import Assignment
+    from canvasapi.course import Course
+    from canvasbrush import Brush
+    from rich.console import Console
+
+
+class LazyConsole:
+    """Stands in for a :class:`rich.console.Console` until it is first used."""
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._console = None
 
-from cli.due_info import DueInfo
+    def __getattr__(self, name: str):
+        if self._console is None:
+            from rich.console import Console
 
-console = Console(highlight=False)
+            self._console = Console(**self._kwargs)
+
+        return getattr(self._console, name)
+
+
+# swapped for a real Console by `brush serve` and the benchmarks
+console: LazyConsole | Console = LazyConsole(highlight=False)
 
 
 class BrushCli:
     @staticmethod
-    def parser_init(program_name: str):
+    def parser_init(program_name: str, argv: list[str] = None):
         """Initializes the parser and returns the arguments."""
+        return BrushCli.parser(program_name).parse_args(argv)
+
+    @staticmethod
+    def parser(program_name: str):
+        """Builds the parser of every subcommand."""
         parser = argparse.ArgumentParser(prog=program_name)
+        parser.set_defaults(program_name=program_name)
+        parser.add_argument(
+            "--profile",
+            action=argparse.BooleanOptionalAction,
+            help="print every HTTP request the command made, grouped by what it was for. default: FALSE",
+        )
+        parser.add_argument(
+            "--profile-trace",
+            type=str,
+            metavar="FILE",
+            help="also write the requests to FILE as a Chrome trace, implies --profile",
+        )
         subparsers = parser.add_subparsers(
             title="subcommands", help="valid subcommands", required=True
         )
@@ -38,6 +74,27 @@ class BrushCli:
             type=str,
             help="how to order the assignments. accepted values: position, name, due_at",
         )
+        parser_assignments.add_argument(
+            "--pending",
+            action=argparse.BooleanOptionalAction,
+            help="only show assignments that are open and not submitted yet. default: FALSE",
+        )
+        parser_assignments.add_argument(
+            "--match",
+            type=str,
+            help="only show assignments whose name contains MATCH",
+        )
+        parser_assignments.add_argument(
+            "--offline",
+            action=argparse.BooleanOptionalAction,
+            help="answer from the local mirror kept by the sync command. default: FALSE",
+        )
+        parser_assignments.add_argument(
+            "--format",
+            choices=["text", "json", "ndjson", "tsv"],
+            default="text",
+            help="print the assignments as rich text, or as raw fields for scripts. default: text",
+        )
         parser_assignments.set_defaults(func=BrushCli.list_assignments)
 
         # create parser for assignment command
@@ -50,12 +107,66 @@ class BrushCli:
         parser_assignment.add_argument(
             "--course", "-c", type=str, help="the course to view an assignment for"
         )
+        parser_assignment.add_argument(
+            "--offline",
+            action=argparse.BooleanOptionalAction,
+            help="answer from the local mirror kept by the sync command. default: FALSE",
+        )
+        parser_assignment.add_argument(
+            "--format",
+            choices=["text", "json", "ndjson", "tsv"],
+            default="text",
+            help="print the assignment as rich text, or as raw fields for scripts. default: text",
+        )
         parser_assignment.set_defaults(func=BrushCli.view_assignment)
 
+        # create parser for agenda command
+        parser_agenda = subparsers.add_parser(
+            "agenda", help="view what is due across every configured course"
+        )
+        parser_agenda.add_argument(
+            "--all",
+            action=argparse.BooleanOptionalAction,
+            help="include submitted and locked assignments. default: FALSE",
+        )
+        parser_agenda.add_argument(
+            "--within",
+            type=float,
+            help="only show assignments due in the next WITHIN hours",
+        )
+        parser_agenda.add_argument(
+            "--offline",
+            action=argparse.BooleanOptionalAction,
+            help="answer from the local mirror kept by the sync command. default: FALSE",
+        )
+        parser_agenda.add_argument(
+            "--format",
+            choices=["text", "json", "ndjson", "tsv"],
+            default="text",
+            help="print the assignments as rich text, or as raw fields for scripts. default: text",
+        )
+        parser_agenda.set_defaults(func=BrushCli.agenda)
+
+        # create parser for sync command
+        parser_sync = subparsers.add_parser(
+            "sync", help="update the local mirror used by --offline"
+        )
+        parser_sync.add_argument(
+            "course", type=str, nargs="*", help="the courses to sync. default: all"
+        )
+        parser_sync.set_defaults(func=BrushCli.sync)
+
         # create parser for submit command
         parser_submit = subparsers.add_parser("submit", help="submit to an assignment")
         parser_submit.add_argument(
-            "files_or_urls", type=str, nargs="+", help="the files to submit"
+            "files_or_urls", type=str, nargs="*", help="the files to submit"
+        )
+        parser_submit.add_argument(
+            "--manifest",
+            "-m",
+            type=str,
+            metavar="FILE",
+            help="submit the entries of a JSON Lines manifest, resuming where a previous run stopped",
         )
         parser_submit.add_argument(
             "--course", "-c", type=str, help="the course to upload to"
@@ -100,12 +211,113 @@ class BrushCli:
         )
         parser_submit.set_defaults(func=BrushCli.upload)
 
-        return parser.parse_args()
+        # create parser for serve command
+        parser_serve = subparsers.add_parser(
+            "serve",
+            help="keep Brush running in the background so later commands start faster",
+        )
+        parser_serve.add_argument(
+            "--socket",
+            type=str,
+            help="the Unix socket to listen on. default: $BRUSH_SOCKET, or brush.sock in the cache directory",
+        )
+        parser_serve.set_defaults(func=BrushCli.serve)
+
+        # create parser for completion command
+        parser_completion = subparsers.add_parser(
+            "completion",
+            help="print a shell completion script, or refresh what it completes",
+        )
+        parser_completion.add_argument(
+            "shell",
+            nargs="?",
+            choices=["bash", "zsh"],
+            help="the shell to print the completion script for",
+        )
+        parser_completion.add_argument(
+            "--refresh",
+            action=argparse.BooleanOptionalAction,
+            help="update the course aliases and assignments that are completed. default: FALSE",
+        )
+        parser_completion.add_argument(
+            "--offline",
+            action=argparse.BooleanOptionalAction,
+            help="refresh from the local mirror kept by the sync command. default: FALSE",
+        )
+        parser_completion.set_defaults(func=BrushCli.completion)
+
+        return parser
+
+    @staticmethod
+    def run(args: argparse.Namespace, brush: Brush):
+        """Runs the chosen subcommand, profiling its requests if asked to."""
+        if not (args.profile or args.profile_trace):
+            return args.func(args, brush)
+
+        from canvasbrush.profiler import Profiler
+
+        profiler = Profiler()
+        profiler.attach(brush._requester)
+        try:
+            args.func(args, brush)
+        finally:
+            profiler.detach(brush._requester)
+            BrushCli.print_profile(profiler)
+            if args.profile_trace:
+                profiler.write_trace(args.profile_trace)
+                console.print(
+                    f"📈 Trace written to [bold blue]{args.profile_trace}[/bold blue]"
+                )
+
+    @staticmethod
+    def print_profile(profiler):
+        """Prints a table of the requests a profiler recorded."""
+        import humanize
+        from rich.table import Table
+
+        table = Table(title="HTTP requests", title_justify="left")
+        table.add_column("Phase", no_wrap=True)
+        table.add_column("Endpoint", overflow="fold")
+        table.add_column("Requests")
+        table.add_column("Time", justify="right", no_wrap=True)
+        table.add_column("Slowest", justify="right", no_wrap=True)
+        table.add_column("Sent/Received", justify="right", no_wrap=True)
+
+        rows = profiler.summary()
+        for row in rows:
+            notes = []
+            if row["cached"]:
+                notes.append(f"{row['cached']} cached")
+            if row["repeated"]:
+                notes.append(f"[yellow]{row['repeated']} repeated[/yellow]")
+            if row["errors"]:
+                notes.append(f"[red]{row['errors']} failed[/red]")
+
+            table.add_row(
+                row["phase"],
+                f"{row['method']} {row['endpoint']}",
+                f"{row['requests']} ({', '.join(notes)})"
+                if notes
+                else str(row["requests"]),
+                f"{row['time'] * 1000:.0f} ms",
+                f"{row['slowest'] * 1000:.0f} ms",
+                f"{humanize.naturalsize(row['sent'], gnu=True)}/"
+                f"{humanize.naturalsize(row['received'], gnu=True)}",
+            )
+
+        console.print(table)
+        total = sum(row["requests"] for row in rows)
+        console.print(
+            f"⏱  {total} {'request' if total == 1 else 'requests'}, "
+            f"{profiler.wall_time() * 1000:.0f} ms from the first to the last"
+        )
 
     @staticmethod
     def derive_grade_string(
         brush: Brush, assignment: Assignment, course: Course = None
     ):
+        from canvasbrush.util import is_integer, to_num
+
         submission = assignment.submission
         grade = submission["grade"] if submission["grade"] else None
         grade = (
@@ -116,9 +328,14 @@ class BrushCli:
 
         if "online_quiz" in assignment.submission_types:
             if grade or grade == 0:
-                course = course if course else brush.get_course(assignment.course_id)
-                quiz = course.get_quiz(assignment.quiz_id)
-                total = quiz.points_possible
+                total = brush.quiz_points(
+                    course.id if course else assignment.course_id
+                ).get(assignment.quiz_id)
+                if total is None:
+                    course = (
+                        course if course else brush.get_course(assignment.course_id)
+                    )
+                    total = course.get_quiz(assignment.quiz_id).points_possible
 
                 grade_cmp = grade / total * 100
 
@@ -166,6 +383,67 @@ class BrushCli:
 
         return grade_string
 
+    @staticmethod
+    def is_pending(assignment: Assignment):
+        """Whether an assignment is open and has not been submitted yet."""
+        return (
+            assignment.submission["workflow_state"] == "unsubmitted"
+            and not assignment.locked_for_user
+        )
+
+    @staticmethod
+    def assignment_cells(
+        brush: Brush, assignment: Assignment, calendar, course: Course = None
+    ):
+        """Renders an assignment's name and grade, lock state and due date."""
+        grade_string = BrushCli.derive_grade_string(brush, assignment, course)
+        dinfo = calendar.get(assignment.due_at)
+
+        locked_info = (
+            f"🔒 {assignment.lock_explanation}"
+            if assignment.locked_for_user
+            else "🔓 Open"
+        )
+        due_string = f"📅🚫 No due date" if not dinfo.exists else f"📅 Due for {dinfo}"
+
+        overdue = (
+            f"[red]OVERDUE[/red] "
+            if dinfo.exists
+            and calendar.now > dinfo.object
+            and BrushCli.is_pending(assignment)
+            else ""
+        )
+
+        return (
+            f"{overdue}[bold]{assignment.name}[/bold]{grade_string}",
+            locked_info,
+            due_string,
+        )
+
+    @staticmethod
+    def assignment_summary(
+        brush: Brush, assignment: Assignment, course: Course = None, calendar=None
+    ):
+        """Renders an assignment's name, grade, lock state and due date."""
+        from cli.due_info import DueCalendar
+
+        return "\n".join(
+            BrushCli.assignment_cells(
+                brush, assignment, calendar or DueCalendar(), course
+            )
+        )
+
+    @staticmethod
+    def did_you_mean(suggestions: list[str]):
+        """Phrases a list of suggestions to append to an error message."""
+        if not suggestions:
+            return ""
+
+        quoted = [f'"{suggestion}"' for suggestion in suggestions]
+        if len(quoted) == 1:
+            return f" Did you mean {quoted[0]}?"
+        return f" Did you mean {', '.join(quoted[:-1])} or {quoted[-1]}?"
+
     @staticmethod
     def view_assignment(args: argparse.Namespace, brush: Brush):
         try:
@@ -176,49 +454,42 @@ class BrushCli:
             )
         except Exception as e:
             if "invalid course provided" in str(e):
+                course_string = args.course if args.course else args.assignment[0]
                 sys.exit(
-                    f'No course was found for your search: "{"".join(args.course if args.course else args.assignment[0])}".'
+                    f'No course was found for your search: "{"".join(course_string)}".'
+                    + BrushCli.did_you_mean(brush.suggest_courses(course_string))
                 )
             else:
                 sys.exit(f"Brush encountered an error while getting the course: {e}")
 
-        assignment_string = (
-            args.assignment + ["noassump"]
-            if args.course
-            else args.assignment[1:] + ["noassump"]
-        )
+        tokens = args.assignment if args.course else args.assignment[1:]
         try:
-            assignment = brush.resolve_assignment(course, assignment_string)
+            # short forms like `act3`, as completed by the shell, are tried
+            # before the tokens are searched for as a name
+            try:
+                assignment = brush.resolve_assignment(course, tokens)
+            except ValueError:
+                assignment = brush.resolve_assignment(course, tokens + ["noassump"])
         except Exception as e:
             if "no valid assignment was found for string" in str(e):
+                look_for = " ".join(tokens)
                 sys.exit(
-                    f'No assignment was found for your search: "{" ".join(args.assignment[1:] if not args.course else args.assignment)}".'
+                    f'No assignment was found for your search: "{look_for}".'
+                    + BrushCli.did_you_mean(
+                        brush.assignment_index(course).suggest(look_for)
+                    )
                 )
             else:
                 sys.exit(
                     f"Brush encountered an error while getting the assignment: {e}"
                 )
 
-        grade_string = BrushCli.derive_grade_string(brush, assignment, course)
-        dinfo = DueInfo(assignment.due_at, "America/Hermosillo")
-
-        locked_info = (
-            f"🔒 {assignment.lock_explanation}"
-            if assignment.locked_for_user
-            else "🔓 Open"
-        )
-        due_string = (
-            f"📅🚫 No due date" if not assignment.due_at else f"📅 Due for {dinfo}"
-        )
+        if args.format != "text":
+            from cli.output import assignment_record, write_records
 
-        overdue = (
-            f"[red]OVERDUE[/red] "
-            if dinfo.exists
-            and datetime.now().astimezone() > dinfo.object
-            and assignment.submission["workflow_state"] == "unsubmitted"
-            and not assignment.locked_for_user
-            else ""
-        )
+            return write_records(
+                [assignment_record(assignment, course.id)], args.format, single=True
+            )
 
         match assignment.submission["workflow_state"]:
             case "submitted":
@@ -235,9 +506,7 @@ class BrushCli:
                 submission_state = "⚠ Submission data invalid"
 
         console.print(
-            f"""{overdue}[bold]{assignment.name}[/bold]{grade_string}
-{locked_info}
-{due_string}
+            f"""{BrushCli.assignment_summary(brush, assignment, course)}
     {submission_state}"""
         )
 
@@ -245,60 +514,205 @@ class BrushCli:
     def list_assignments(args: argparse.Namespace, brush: Brush):
         course = brush.resolve_course(" ".join(args.course))
 
-        normalized = ""
-        include_order_by = False
+        normalized = "position"
         if isinstance(args.order_by, str):
-            if (
-                (normalized := re.sub(r"\s+", "_", args.order_by).lower()) == "position"
-                or normalized == "name"
-                or "due" in normalized
-            ):
-                if "due" in normalized:
-                    normalized = "due_at"
-                include_order_by = True
-            else:
+            normalized = re.sub(r"\s+", "_", args.order_by).lower()
+            if "due" in normalized:
+                normalized = "due_at"
+            elif normalized not in ("position", "name"):
                 raise ValueError(
                     f'invalid value for order_by: {args.order_by}. valid values: "position", "name", "due_at"'
                 )
 
-        kw = (
-            {"include": ["submission"], "order_by": normalized}
-            if include_order_by
-            else {"include": "submission"}
+        # assignments come in by position, and are filtered and sorted here
+        # rather than by Canvas, so that every order shares the same request
+        assignments: Iterable = (
+            assignment
+            for assignment in brush.course_assignments(course)
+            if (not args.pending or BrushCli.is_pending(assignment))
+            and (not args.match or args.match.lower() in assignment.name.lower())
         )
+        if normalized == "name":
+            assignments = sorted(assignments, key=lambda a: a.name.casefold())
+        elif normalized == "due_at":
+            assignments = sorted(
+                assignments, key=lambda a: (a.due_at is None, a.due_at or "")
+            )
 
-        assignments = course.get_assignments(**kw)
+        if args.format != "text":
+            from cli.output import assignment_record, write_records
 
-        for i, assignment in enumerate(assignments):
-            if i != 0:
-                console.print("")
+            return write_records(
+                (assignment_record(a, course.id) for a in assignments), args.format
+            )
 
-            grade_string = BrushCli.derive_grade_string(brush, assignment, course)
-            dinfo = DueInfo(assignment.due_at, "America/Hermosillo")
+        from cli.due_info import DueCalendar
+        from cli.listing import Listing
 
-            locked_info = (
-                f"🔒 {assignment.lock_explanation}"
-                if assignment.locked_for_user
-                else "🔓 Open"
+        calendar = DueCalendar()
+        listing = Listing("Assignment", "Due", "Status")
+        for assignment in assignments:
+            name, status, due = BrushCli.assignment_cells(
+                brush, assignment, calendar, course
             )
-            due_string = f"📅🚫 No due date" if not dinfo.exists else f"📅 Due for {dinfo}"
-
-            overdue = (
-                f"[red]OVERDUE[/red] "
-                if dinfo.exists
-                and datetime.now().astimezone() > dinfo.object
-                and assignment.submission["workflow_state"] == "unsubmitted"
-                and not assignment.locked_for_user
-                else ""
+            listing.add_row(name, due, status)
+
+        # the whole listing is laid out and written at once
+        console.print(listing)
+
+    @staticmethod
+    def agenda(args: argparse.Namespace, brush: Brush):
+        show_all = args.all if args.all != None else False
+        names = {course["id"]: course["aliases"][0] for course in brush.course_map}
+
+        agenda = brush.agenda(within=args.within, unsubmitted=not show_all)
+
+        if args.format != "text":
+            from cli.output import assignment_record, write_records
+
+            return write_records(
+                (assignment_record(a, course_id) for course_id, a in agenda),
+                args.format,
             )
+
+        from cli.due_info import DueCalendar
+
+        calendar = DueCalendar()
+        first = True
+        for course_id, assignment in agenda:
+            if not first:
+                console.print("")
+            first = False
+
+            console.print(
+                f"[dim]{names.get(course_id, course_id)}[/dim] "
+                + BrushCli.assignment_summary(brush, assignment, calendar=calendar)
+            )
+
+    @staticmethod
+    def sync(args: argparse.Namespace, brush: Brush):
+        course_ids = []
+        for course_string in args.course:
+            course = brush.find_course(course_string)
+            if not course:
+                sys.exit(
+                    f'No course was found for your search: "{course_string}".'
+                    + BrushCli.did_you_mean(brush.suggest_courses(course_string))
+                )
+            course_ids.append(course["id"])
+
+        names = {course["id"]: course["aliases"][0] for course in brush.course_map}
+        for course_id, assignments, submissions in brush.sync(course_ids or None):
             console.print(
-                f"""{overdue}[bold]{assignment.name}[/bold]{grade_string}
-{locked_info}
-{due_string}"""
+                f"🔄 [bold]{names[course_id]}[/bold]: {assignments} assignments and {submissions} submissions updated"
             )
 
+    @staticmethod
+    def serve(args: argparse.Namespace, brush: Brush):
+        from cli.client import fingerprint, socket_path
+        from cli.server import bind, serve
+
+        path = args.socket or socket_path()
+        try:
+            sock = bind(path)
+        except Exception as e:
+            sys.exit(f"Brush encountered an error while starting the service: {e}")
+
+        console.print(f"👂 Listening on [bold blue]{path}[/bold blue]")
+        serve(
+            brush,
+            sock,
+            args.program_name,
+            getattr(args, "fingerprint", None) or fingerprint(),
+        )
+
+    @staticmethod
+    def completion(args: argparse.Namespace, brush: Brush):
+        from cli import completion
+
+        if args.shell:
+            print(completion.script(args.shell, args.program_name), end="")
+            return
+        if not args.refresh:
+            sys.exit("Choose a shell to print the completion script for, or --refresh.")
+
+        path = os.path.join(brush.cache_dir, "completion.json")
+        try:
+            with open(path, "r") as f:
+                assignments = json.load(f).get("assignments", {})
+        except (OSError, ValueError):
+            assignments = {}
+
+        try:
+            for course_id, tokens in brush.assignment_tokens().items():
+                assignments[str(course_id)] = tokens
+        finally:
+            # the aliases are written even when Canvas cannot be reached, with
+            # the assignments of the last refresh that could
+            completion.write(
+                path,
+                {
+                    **completion.describe(BrushCli.parser(args.program_name)),
+                    "courses": {
+                        alias: str(course["id"])
+                        for course in brush.course_map
+                        for alias in course["aliases"]
+                    },
+                    "assignments": assignments,
+                },
+            )
+
+    @staticmethod
+    def submit_manifest(
+        args: argparse.Namespace,
+        brush: Brush,
+        skip_bad_arguments: bool,
+        allow_resubmit: bool,
+    ):
+        from canvasbrush.manifest import read_manifest
+
+        journal = brush.manifest_journal(args.manifest)
+        if len(journal):
+            console.print(f"⏩ Resuming: {len(journal)} entries were already submitted.")
+
+        uploaded = submitted = skipped = 0
+        try:
+            for event in brush.submit_manifest(
+                read_manifest(args.manifest),
+                journal,
+                args.comment,
+                skip_invalid=skip_bad_arguments,
+                allow_resubmit=allow_resubmit,
+            ):
+                match event:
+                    case ("skipped", _):
+                        skipped += 1
+                    case ("invalid", entry, error):
+                        console.print(f"[yellow]Skipped {entry}: {error}[/yellow]")
+                    case ("upload", _):
+                        uploaded += 1
+                    case ("submitted", entries, assignment, _):
+                        submitted += len(entries)
+                        for entry in entries:
+                            console.print(
+                                f"📄 {entry} [dim]→[/dim] [bold]{assignment.name}[/bold]"
+                            )
+        except (OSError, ValueError) as e:
+            sys.exit(f"Brush stopped at an entry of the manifest: {e}")
+        finally:
+            journal.close()
+
+        console.print(
+            f"✅ Submitted {submitted} entries ({uploaded} files uploaded, {skipped} already submitted)."
+        )
+
     @staticmethod
     def upload(args: argparse.Namespace, brush: Brush):
+        import validators
+        from pathlib import Path
+        from canvasbrush.util import AssignmentPlusFile, ProgressBar
+        from canvasbrush.zipstream import ZipStream
+
         assignments: list[AssignmentPlusFile] = []
 
         skip_bad_arguments = (
@@ -319,6 +733,13 @@ class BrushCli:
 
         recursive = args.recursive if args.recursive != None else False
 
+        if args.manifest:
+            return BrushCli.submit_manifest(
+                args, brush, skip_bad_arguments, allow_resubmit
+            )
+        if not args.files_or_urls:
+            sys.exit("Nothing to submit: give files, URLs or a --manifest.")
+
         resource_args = []
         for resource in args.files_or_urls:
             if (
@@ -327,7 +748,7 @@ class BrushCli:
                 and allow_submit_directories
             ):
                 if zip_directories:
-                    raise Exception("zipping directories is not yet supported")
+                    resource_args.append(resource)
                 elif recursive:
                     [
                         resource_args.append(str(f))
@@ -344,71 +765,68 @@ class BrushCli:
                 resource_args.append(resource)
 
         if not args.course:
-            for i, resource in enumerate(resource_args):
-                if i % 2 == 0:
-                    if os.path.exists(resource):
-                        assignment = brush.resolve_assignment_from_filename(
-                            os.path.basename(resource)
-                        )
-                        resource_path = resource
-
-                    elif "::" in resource:
-                        split = resource.split("::")
-                        if len(split) > 1 and validators.url(split[1]):
-                            assignment = brush.resolve_assignment_from_filename(
-                                split[0] + ".pdf"
-                            )
-                            resource_path = split[1]
-                        else:
-                            if skip_bad_arguments:
-                                continue
-                            else:
-                                raise ValueError(
-                                    "invalid URL argument (without course)"
-                                )
+            # every file is matched to its assignment before anything is
+            # uploaded, so that the whole batch is resolved in one pass
+            planned = []
+            for resource in resource_args:
+                if os.path.isdir(resource) and zip_directories:
+                    resource_path = ZipStream(resource)
+                    planned.append((resource_path.name, resource_path))
+
+                elif os.path.exists(resource):
+                    planned.append((os.path.basename(resource), resource))
+
+                elif "::" in resource:
+                    split = resource.split("::")
+                    if len(split) > 1 and validators.url(split[1]):
+                        planned.append((split[0] + ".pdf", split[1]))
                     else:
                         if skip_bad_arguments:
                             continue
                         else:
-                            raise ValueError("invalid file argument")
-
-                    skip = False
-                    if not allow_resubmit:
-                        for () in assignment.get_submissions():
-                            if skip_bad_arguments:
-                                skip = True
-                                break
-                            else:
-                                raise ValueError("resubmitting not allowed")
-
-                    if skip:
+                            raise ValueError("invalid URL argument (without course)")
+                else:
+                    if skip_bad_arguments:
                         continue
+                    else:
+                        raise ValueError("invalid file argument")
+
+            try:
+                plan = brush.plan_submissions([name for name, _ in planned])
+            except ValueError as e:
+                sys.exit(f"Brush could not match every file to an assignment: {e}")
+
+            # every assignment is checked before anything is uploaded, so
+            # that a batch is rejected as a whole rather than half-way through
+            blocked = set()
+            for assignment, problem, blocking in brush.preflight(plan, allow_resubmit):
+                if blocking and not skip_bad_arguments:
+                    blocked.add(assignment.id)
+                    console.print(
+                        f"[bold red]ERROR:[/bold red] {assignment.name}: {problem}."
+                    )
+                elif blocking:
+                    blocked.add(assignment.id)
+                    console.print(
+                        f"[yellow]Skipping {assignment.name}: {problem}.[/yellow]"
+                    )
+                else:
+                    console.print(f"[yellow]{assignment.name}: {problem}.[/yellow]")
 
-                    assignments.append(AssignmentPlusFile(assignment, resource_path))
-
-                    if i != len(args.files_or_urls) - 1:
-                        path_next = args.files_or_urls[i + 1]
-
-                        if "::" in path_next:
-                            split = path_next.split("::")
-                            if len(split) > 1 and validators.url(split[1]):
-                                assignment = brush.resolve_assignment_from_filename(
-                                    split[0] + ".pdf"
-                                )
-                                resource_path = split[1]
-                            else:
-                                raise ValueError(
-                                    "invalid URL argument (without course)"
-                                )
-                        else:
-                            assignment = brush.resolve_assignment_from_filename(
-                                os.path.basename(path_next)
-                            )
-                            resource_path = path_next
+            if blocked and not skip_bad_arguments:
+                sys.exit(
+                    "Brush cannot submit to every assignment; nothing was uploaded."
+                )
 
-                        assignments.append(
-                            AssignmentPlusFile(assignment, resource_path)
-                        )
+            for (name, resource_path), assignment in zip(planned, plan):
+                if assignment.id in blocked:
+                    continue
+
+                console.print(f"📄 {name} [dim]→[/dim] [bold]{assignment.name}[/bold]")
+                assignments.append(AssignmentPlusFile(assignment, resource_path))
+
+            if not assignments:
+                sys.exit("There is nothing to submit.")
 
             bar = ProgressBar(
                 len(assignments),
@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import socket
+import shutil
+import hashlib
+
+# this module is imported before anything else on every invocation, so it
+# must only ever depend on the standard library
+
+
+def socket_path():
+    """Returns where `brush serve` listens by default."""
+    if os.environ.get("BRUSH_SOCKET"):
+        return os.environ["BRUSH_SOCKET"]
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "brush", "brush.sock")
+
+
+def fingerprint():
+    """Returns what identifies the account and configuration brush runs with.
+
+    The API key is only included as a hash. A service only runs commands
+    whose fingerprint matches its own, so that nobody acts as the account
+    the service was started with by accident.
+    """
+    config_path = os.environ.get("BRUSH_CONFIG_PATH") or os.path.join(
+        os.path.expanduser("~"), ".brushrc"
+    )
+    key = os.environ.get("CANVAS_API_KEY") or ""
+
+    return {
+        "api_url": os.environ.get("CANVAS_API_URL"),
+        "api_key": hashlib.sha256(key.encode()).hexdigest(),
+        "config_path": os.path.abspath(config_path),
+    }
+
+
+def connect(path: str, timeout: float = None):
+    """Opens an HTTP connection over the Unix socket at `path`."""
+    # http.client costs more to import than everything else the CLI needs
+    # before forwarding, and is only needed when there is a service to talk to
+    import http.client
+
+    class UnixHTTPConnection(http.client.HTTPConnection):
+        def connect(self):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(self.timeout)
+            self.sock.connect(path)
+
+    connection = UnixHTTPConnection("localhost", timeout=timeout)
+    connection.connect()
+
+    return connection
+
+
+def forward(argv: list[str], path: str = None):
+    """Runs a command on a running `brush serve`, returning its exit code.
+
+    Returns None, without printing anything, when no service is listening or
+    it runs with different credentials or configuration, so the caller can
+    run the command itself.
+    """
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return None
+
+    try:
+        connection = connect(path)
+    except OSError:
+        return None
+
+    body = json.dumps(
+        {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "isatty": sys.stdout.isatty(),
+            "width": shutil.get_terminal_size().columns,
+            "fingerprint": fingerprint(),
+        }
+    )
+    try:
+        connection.request("POST", "/run", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        result = json.loads(response.read())
+    finally:
+        connection.close()
+
+    if response.status != 200:
+        return None
+
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+
+    return result["code"]
@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import time
+
+# shells run this on every tab press, so like `cli.client` it must only ever
+# depend on the standard library. the aliases and assignments it completes are
+# read from a file that `brush completion --refresh` writes ahead of time.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# how old the completion file may get before a refresh is started, and how
+# long to wait for a refresh that was started before starting another one
+REFRESH_AFTER = 6 * 60 * 60
+RETRY_AFTER = 60
+
+BASH = """_brush() {{
+    local IFS=$'\\n'
+    COMPREPLY=($({command} __complete "$((COMP_CWORD - 1))" "${{COMP_WORDS[@]:1}}" 2>/dev/null))
+}}
+complete -o default -F _brush {program_name}
+"""
+
+ZSH = """#compdef {program_name}
+_brush() {{
+    local -a candidates
+    candidates=("${{(@f)$({command} __complete "$((CURRENT - 2))" "${{words[@]:1}}" 2>/dev/null)}}")
+    if [[ -n "${{candidates[1]}}" ]]; then
+        compadd -- $candidates
+    else
+        _files
+    fi
+}}
+compdef _brush {program_name}
+"""
+
+
+def script(shell: str, program_name: str):
+    """Returns the completion script for `shell`."""
+    # site-packages are not needed to complete, and take longer to set up
+    # than everything else a tab press does
+    command = f'"{sys.executable}" -S "{ROOT}"'
+    template = BASH if shell == "bash" else ZSH
+    return template.format(command=command, program_name=program_name)
+
+
+def completion_path():
+    """Returns where the completion file is, following the configuration."""
+    userpath = os.environ.get("BRUSH_CONFIG_PATH")
+    config_path = userpath or os.path.join(os.path.expanduser("~"), ".brushrc")
+
+    cache_dir = None
+    try:
+        with open(config_path, "r") as f:
+            cache_dir = json.load(f).get("cache_dir")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if not cache_dir:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        cache_dir = os.path.join(base, "brush")
+
+    return os.path.join(cache_dir, "completion.json")
+
+
+def write(path: str, data: dict):
+    """Writes the completion file in one step, so a tab press never reads half of it."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def describe(parser):
+    """Returns the subcommands of a parser with the options each one takes.
+
+    Options are mapped to the destination of their value, or to None when
+    they take none, and positionals are listed by destination in order.
+    """
+
+    def options(actions):
+        return {
+            option: action.dest if action.nargs != 0 else None
+            for action in actions
+            for option in action.option_strings
+        }
+
+    subparsers = next(a for a in parser._actions if a.choices and not a.option_strings)
+    return {
+        "options": options(parser._actions),
+        "commands": {
+            name: {
+                "options": options(subparser._actions),
+                "positionals": [
+                    a.dest for a in subparser._actions if not a.option_strings
+                ],
+            }
+            for name, subparser in subparsers.choices.items()
+        },
+    }
+
+
+def refresh_in_background(path: str):
+    """Starts `brush completion --refresh` if the completion file is stale."""
+    now = time.time()
+    marker = f"{path}.refreshing"
+
+    for stale, after in ((path, REFRESH_AFTER), (marker, RETRY_AFTER)):
+        try:
+            if now - os.path.getmtime(stale) < after:
+                return
+        except OSError:
+            pass
+
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(marker, "w"):
+            pass
+    except OSError:
+        return
+
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, ROOT, "completion", "--refresh"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def matching(candidates: list[str], word: str):
+    """Returns the candidates that start with `word`, or else the ones like it."""
+    prefix = word.lower()
+    found = [c for c in candidates if c.lower().startswith(prefix)]
+    if found or not word:
+        return found
+
+    # a typo still completes, as long as something is close enough to it
+    from canvasbrush.fuzzy import TrigramIndex
+
+    index = TrigramIndex((c, c) for c in candidates)
+    return [value for _, _, value in index.search(word, limit=5, threshold=0.3)]
+
+
+def candidates(data: dict, words: list[str], current: int):
+    """Returns what the word at `current` of a command line could be."""
+    words = words + [""] * (current + 1 - len(words))
+    word = words[current]
+    courses = data.get("courses", {})
+
+    def tokens(course: str):
+        # only an alias the CLI would accept, which ignores case alone
+        course_id = next(
+            (i for alias, i in courses.items() if alias.lower() == course.lower()),
+            None,
+        )
+        return data.get("assignments", {}).get(str(course_id), [])
+
+    # the subcommand is the first word that is neither an option nor the
+    # value of one
+    position, command = 0, None
+    while position < current:
+        if words[position].startswith("-"):
+            position += 1 + bool(data["options"].get(words[position]))
+            continue
+        command = data["commands"].get(words[position])
+        break
+
+    if command is None:
+        if word.startswith("-"):
+            return matching(list(data["options"]), word)
+        return matching(list(data["commands"]), word)
+
+    options = command["options"]
+    given: dict[str, str] = {}
+    positionals: list[str] = []
+    index = position + 1
+    while index < current:
+        if words[index] in options and options[words[index]]:
+            given[options[words[index]]] = words[index + 1]
+            index += 2
+            continue
+        if not words[index].startswith("-"):
+            positionals.append(words[index])
+        index += 1
+
+    previous = words[current - 1] if current > position + 1 else None
+    if previous in options and options[previous]:
+        dest = options[previous]
+        if dest == "course":
+            return matching(list(courses), word)
+        if dest == "assignment" and "course" in given:
+            return matching(tokens(given["course"]), word)
+        return []
+
+    if word.startswith("-"):
+        return matching(list(options), word)
+
+    # commands with a single positional take all of the remaining words
+    dest = command["positionals"][0] if command["positionals"] else None
+    if dest == "course":
+        return matching(list(courses), word)
+    if dest == "assignment" and "course" in given:
+        return matching(tokens(given["course"]), word)
+    if dest == "assignment" and not positionals:
+        return matching(list(courses), word)
+    if dest == "assignment":
+        return matching(tokens(positionals[0]), word)
+
+    return []
+
+
+def complete(argv: list[str]):
+    """Prints the completions of a command line, for the completion scripts.
+
+    `argv` is the index of the word being completed followed by the words
+    after the program name.
+    """
+    try:
+        current = int(argv[0])
+    except (IndexError, ValueError):
+        return 1
+
+    path = completion_path()
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = None
+
+    refresh_in_background(path)
+    if not data:
+        return 0
+
+    for candidate in candidates(data, argv[1:], current):
+        print(candidate)
+
+    return 0
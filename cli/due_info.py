@@ -1,20 +1,68 @@
-from datetime import tzinfo
+from datetime import date, datetime, timezone as dt_timezone, tzinfo
 from dateutil import parser as timeparser
 from dateutil import tz
 import humanize
 
+DEFAULT_TIMEZONE = "America/Hermosillo"
+
+
+def resolve_timezone(timezone: str | tzinfo):
+    """Returns the tzinfo of a timezone name, or raises ValueError if unknown."""
+    if not isinstance(timezone, str):
+        return timezone
+
+    resolved = tz.gettz(timezone)
+    if resolved is None:
+        raise ValueError(f"unknown timezone: {timezone}")
+    return resolved
+
+
+def humanize_date(local: datetime):
+    return humanize.naturaldate(local).capitalize()
+
 
 class DueInfo:
-    def __init__(self, due_at: str, timezone: str | tzinfo):
-        self.timezone = tz.gettz(timezone) if isinstance(timezone, str) else timezone
+    def __init__(
+        self, due_at: str, timezone: str | tzinfo, humanize_date=humanize_date
+    ):
+        self.timezone = resolve_timezone(timezone)
 
         self.exists = bool(due_at)
-        self.object = timeparser.isoparse(due_at) if self.exists else None
-        self.humanized = (
-            humanize.naturaldate(self.object.astimezone(self.timezone)).capitalize()
-            if self.exists
-            else None
-        )
+        self.object = timeparser.isoparse(due_at) if due_at else None
+        self.local = self.object.astimezone(self.timezone) if self.object else None
+        self.humanized = humanize_date(self.local) if self.local else None
 
     def __str__(self):
-        return f"{self.humanized}, {self.object.astimezone(self.timezone):%H:%M}"
+        return f"{self.humanized}, {self.local:%H:%M}"
+
+
+class DueCalendar:
+    """Formats the due dates of a whole listing.
+
+    The timezone and the current time are resolved once for every row, each
+    distinct due date is parsed once, and each calendar date is humanized
+    once, however many assignments share them.
+    """
+
+    def __init__(self, timezone: str | tzinfo = DEFAULT_TIMEZONE):
+        self.timezone = resolve_timezone(timezone)
+        # kept in UTC, like the parsed due dates, so comparing them never has
+        # to look up the listing's timezone
+        self.now = datetime.now(dt_timezone.utc)
+        self._infos: dict[str, DueInfo] = {}
+        self._days: dict[date, str] = {}
+
+    def get(self, due_at: str):
+        """Returns the DueInfo of a due date."""
+        info = self._infos.get(due_at)
+        if info is None:
+            info = self._infos[due_at] = DueInfo(due_at, self.timezone, self.humanize)
+
+        return info
+
+    def humanize(self, local: datetime):
+        day = local.date()
+        if day not in self._days:
+            self._days[day] = humanize_date(local)
+
+        return self._days[day]
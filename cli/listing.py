@@ -0,0 +1,55 @@
+from rich.console import Console, ConsoleOptions
+from rich.table import Table
+from rich.text import Text
+
+
+class Listing:
+    """A table of rows that is laid out in a single pass.
+
+    Cells are parsed and measured as they are added, with each distinct
+    markup string parsed only once, so when every row fits the console the
+    whole listing is aligned and written as a single text, without the
+    per-cell layout a rich `Table` does. A listing too wide for the console
+    is rendered as a `Table` instead, which can wrap its cells.
+    """
+
+    def __init__(self, *headers: str, gap: int = 2):
+        self.headers = [Text(header, style="bold") for header in headers]
+        self.rows: list[list[Text]] = []
+        self.widths = [header.cell_len for header in self.headers]
+        self.gap = gap
+        self._parsed: dict[str, Text] = {}
+
+    def add_row(self, *cells: str):
+        row = []
+        for column, cell in enumerate(cells):
+            text = self._parsed.get(cell)
+            if text is None:
+                text = self._parsed[cell] = Text.from_markup(cell)
+            row.append(text)
+            self.widths[column] = max(self.widths[column], text.cell_len)
+
+        self.rows.append(row)
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions):
+        if sum(self.widths) + self.gap * (len(self.widths) - 1) > options.max_width:
+            table = Table(box=None, pad_edge=False, show_edge=False)
+            for header in self.headers:
+                table.add_column(header, overflow="fold")
+            for row in self.rows:
+                table.add_row(*row)
+            yield table
+            return
+
+        listing = Text(no_wrap=True, end="")
+        last = len(self.widths) - 1
+        for row in [self.headers, *self.rows]:
+            for column, cell in enumerate(row):
+                listing.append_text(cell)
+                if column != last:
+                    listing.append(
+                        " " * (self.widths[column] - cell.cell_len + self.gap)
+                    )
+            listing.append("\n")
+
+        yield listing
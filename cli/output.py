@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+
+# the machine-readable formats only need the standard library, so scripts
+# piping brush into other tools never wait for rich
+
+ASSIGNMENT_FIELDS = [
+    "course_id",
+    "id",
+    "name",
+    "position",
+    "due_at",
+    "lock_at",
+    "locked_for_user",
+    "lock_explanation",
+    "grading_type",
+    "submission_types",
+    "points_possible",
+    "quiz_id",
+]
+
+SUBMISSION_FIELDS = ["workflow_state", "submitted_at", "graded_at", "grade", "score"]
+
+FIELDS = ASSIGNMENT_FIELDS + SUBMISSION_FIELDS
+
+
+def assignment_record(assignment, course_id=None):
+    """Returns the raw fields of an assignment and its submission, flattened."""
+    record = {name: getattr(assignment, name, None) for name in ASSIGNMENT_FIELDS}
+    if record["course_id"] is None:
+        record["course_id"] = course_id
+
+    submission = getattr(assignment, "submission", None) or {}
+    for name in SUBMISSION_FIELDS:
+        record[name] = submission.get(name)
+
+    return record
+
+
+def tsv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        value = ",".join(str(v) for v in value)
+
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def write_records(records, format: str, file=None, single: bool = False):
+    """Writes records in a machine-readable format as they are produced.
+
+    `json` writes an array, or a single object when `single` is set,
+    `ndjson` one object per line, and `tsv` a header followed by one row per
+    record with tabs and newlines in values escaped. Nothing is held back
+    beyond the file's own buffering, so a long listing starts coming out
+    with its first page.
+    """
+    file = file or sys.stdout
+
+    try:
+        _write(records, format, file, single)
+    except BrokenPipeError:
+        # the reader, like `head`, has all it wanted. whatever is still
+        # buffered is dropped instead of failing again when Python exits.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, file.fileno())
+
+
+def _write(records, format: str, file, single: bool):
+    if format == "ndjson":
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+    elif format == "tsv":
+        file.write("\t".join(FIELDS) + "\n")
+        for record in records:
+            file.write("\t".join(tsv_value(record[name]) for name in FIELDS) + "\n")
+    elif single:
+        for record in records:
+            file.write(json.dumps(record, indent=2) + "\n")
+    else:
+        file.write("[")
+        for i, record in enumerate(records):
+            file.write(("," if i else "") + "\n  " + json.dumps(record))
+        file.write("\n]\n")
+
+    file.flush()
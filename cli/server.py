@@ -0,0 +1,144 @@
+import io
+import os
+import time
+import socket
+import threading
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+
+import falcon
+import uvicorn
+from rich.console import Console
+
+import cli.brush_cli
+from canvasbrush import Brush
+
+# how long resolution caches are trusted before they are rebuilt
+CACHE_TTL = 5 * 60
+
+
+class RunResource:
+    """Runs CLI commands sent by `cli.client.forward` against a warm Brush."""
+
+    def __init__(self, brush: Brush, program_name: str, fingerprint: dict):
+        """
+        :param brush: The Brush commands are run against.
+        :type brush: :class:`canvasbrush.brush.Brush`
+        :param program_name: The name the CLI is invoked as.
+        :type program_name: str
+        :param fingerprint: The service's own `cli.client.fingerprint()`. \
+            Commands sent with a different one are refused.
+        :type fingerprint: dict
+        """
+        self.brush = brush
+        self.program_name = program_name
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self._warmed_at = time.monotonic()
+
+    def on_post(self, req: falcon.Request, resp: falcon.Response):
+        payload = req.get_media()
+        if payload.get("fingerprint") != self.fingerprint:
+            # the client runs the command itself, with its own credentials
+            resp.status = falcon.HTTP_409
+            resp.media = {"error": "credentials or configuration differ"}
+            return
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        with self._lock:
+            if time.monotonic() - self._warmed_at > CACHE_TTL:
+                self.brush.forget()
+                self._warmed_at = time.monotonic()
+
+            code = self._run(payload, stdout, stderr)
+
+        resp.media = {
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "code": code,
+        }
+
+    def _run(self, payload: dict, stdout: io.StringIO, stderr: io.StringIO):
+        console = cli.brush_cli.console
+        cwd = os.getcwd()
+        cli.brush_cli.console = Console(
+            file=stdout,
+            highlight=False,
+            force_terminal=payload.get("isatty", False),
+            width=payload.get("width", 80),
+        )
+
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                os.chdir(payload.get("cwd", cwd))
+                args = cli.brush_cli.BrushCli.parser_init(
+                    self.program_name, payload["argv"]
+                )
+                self.brush.offline = getattr(args, "offline", None) or False
+                cli.brush_cli.BrushCli.run(args, self.brush)
+
+                # submitting and syncing change what the cached assignments say
+                if args.func in (
+                    cli.brush_cli.BrushCli.upload,
+                    cli.brush_cli.BrushCli.sync,
+                ):
+                    self.brush.forget()
+            return 0
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                stderr.write(f"{e.code}\n")
+                return 1
+            return e.code or 0
+        except Exception:
+            stderr.write(traceback.format_exc())
+            return 1
+        finally:
+            cli.brush_cli.console = console
+            os.chdir(cwd)
+
+
+def bind(path: str):
+    """Binds the Unix domain socket the service listens on.
+
+    A socket file left behind by a service that is no longer running is
+    replaced, and a live one is left alone.
+    """
+    if os.path.exists(path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+            except OSError:
+                os.remove(path)
+            else:
+                raise RuntimeError(f"another service is already listening on {path}")
+
+    os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+
+    # only the user running the service may connect to it. the socket is bound
+    # here because uvicorn would make it world-writable.
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(umask)
+
+    return sock
+
+
+def serve(brush: Brush, sock: socket.socket, program_name: str, fingerprint: dict):
+    """Serves CLI commands on a bound socket until interrupted.
+
+    Only commands sent with `fingerprint` are run.
+    """
+    app = falcon.App()
+    app.add_route("/run", RunResource(brush, program_name, fingerprint))
+
+    path = sock.getsockname()
+    try:
+        uvicorn.run(app, fd=sock.fileno(), interface="wsgi", log_level="warning")
+    finally:
+        sock.close()
+        if os.path.exists(path):
+            os.remove(path)